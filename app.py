@@ -1,9 +1,20 @@
+import time
+import uuid
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import openai
-import re
+
+from charts import radar_figure, trend_figure
+from chat_context import build_leader_context, build_messages, build_summary_request, build_system_prefix, compact_history
+from dataset import get_dataset, release, stored_files
+from keywords import format_keyword_table, leader_keywords
+from llm_cache import cache_key, cached_stream, get_cache
+from llm_gateway import get_gateway
+from percentiles import OVERALL
+from prefetch import PREFETCH_AHEAD, PREFETCH_WAIT_SECONDS, get_prefetcher
+from prompts import MODEL, build_analysis_prompt, build_data_context, build_summary_prompt, collect_latest_feedback, leader_prompts
+from scoring import leader_scores, strongest_weakest
+from survey import find_id_column
+from telemetry import finish_trace, span, stage_breakdown, start_trace, traced
 
 # --- 페이지 설정 ---
 st.set_page_config(
@@ -12,6 +23,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+rerun_trace = start_trace("rerun")
 
 # --- API Key 설정 ---
 try:
@@ -19,14 +31,6 @@ try:
 except (FileNotFoundError, KeyError):
     OPENAI_API_KEY = None
 
-# --- 역량 그룹 정의 ---
-COMPETENCY_GROUPS = {
-    "SKMS에 대한 확신과 열정": ["SKMS에 대한 확신", "구성원/이해관계자 행복 추구", "패기/솔선수범", "Integrity"],
-    "혁신적 전략 수립": ["전략적 Insight", "담당 조직 변화 Design", "비전 공유/지속적 변화 추진"],
-    "과감한 돌파와 실행": ["SUPEX 목표 설정", "내·외부 폭넓은 협업", "신속한 실행 및 성과 창출"],
-    "VWBE 문화구축": ["구성원 VWBE환경 조성 활동 지원", "신뢰 기반의 협력 촉진", "패기 인재 인정/육성"]
-}
-
 # --- [UPDATE] 사전 학습 지식 베이스 (Knowledge Base) ---
 # SKMS 원문 및 Workbook의 핵심 내용을 바탕으로 AI가 코칭에 활용할 수 있도록 정리된 프롬프트입니다.
 SKMS_KNOWLEDGE_BASE = """
@@ -60,154 +64,461 @@ SKMS_KNOWLEDGE_BASE = """
 """
 
 # --- 데이터 로드 및 전처리 ---
-@st.cache_data
-def load_data(file):
+LEADER_LIST_LIMIT = 500  # 선택 목록에 한 번에 올리는 최대 임원 수
+PREFETCH_POLL_SECONDS = 2  # 미리 생성 작업 완료 확인 주기
+
+def load_data(files, stored):
+    # 파싱/점수 계산 결과는 프로세스 단위로 공유 (세션마다 복사하지 않음)
+    # 연도별/평가자별로 나눈 여러 파일은 임원 기준으로 합치며, 새로 올린 파일만 파싱 (이전에 올린 파일은 보관본 사용)
     try:
-        if file.name.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file)
-        return df
+        with span("dataset"):
+            dataset = get_dataset([(f.name, f.getvalue()) for f in files], stored)
     except Exception as e:
         st.error(f"파일 로드 오류: {e}")
         return None
-
-def normalize_text(text):
-    return re.sub(r'[\s\·\.\,\-\_]', '', str(text)).lower()
-
-def parse_columns(df):
-    """
-    컬럼명을 분석하여 점수(Numeric)와 주관식(Text)을 구분하고,
-    대상(구성원/동료)과 연도를 분류합니다.
-    """
-    member_scores = {} 
-    peer_scores = {}   
-    member_texts = {}  # 구성원 주관식
-    peer_texts = {}    # 동료 주관식
-    meta_cols = []
-    
-    peer_pattern = re.compile(r"^(.*)_동료_(\d{2}년)$")
-    member_pattern = re.compile(r"^(.*)_(\d{2}년)$")
-    
-    for col in df.columns:
-        peer_match = peer_pattern.match(col)
-        if peer_match:
-            year = peer_match.group(2)
-            if pd.api.types.is_numeric_dtype(df[col]):
-                if year not in peer_scores: peer_scores[year] = []
-                peer_scores[year].append(col)
-            else:
-                if year not in peer_texts: peer_texts[year] = []
-                peer_texts[year].append(col)
-            continue
-            
-        member_match = member_pattern.match(col)
-        if member_match:
-            year = member_match.group(2)
-            if pd.api.types.is_numeric_dtype(df[col]):
-                if year not in member_scores: member_scores[year] = []
-                member_scores[year].append(col)
-            else:
-                if year not in member_texts: member_texts[year] = []
-                member_texts[year].append(col)
-        else:
-            meta_cols.append(col)
-            
-    return meta_cols, member_scores, peer_scores, member_texts, peer_texts
+    # 이 세션이 새 버전으로 바꾸거나 뺀 파일만 먼저 비울 대상으로 돌림 (다른 세션의 같은 이름 파일은 그대로)
+    dropped = set(st.session_state.get("loaded_files", ())) - set(dataset.partitions)
+    if dropped:
+        release(dropped)
+    st.session_state.loaded_files = dataset.partitions
+    return dataset
+
+def stored_label(info):
+    years = info["years"]
+    period = f"{years[0]}~{years[-1]}" if len(years) > 1 else (years[0] if years else "-")
+    saved = time.strftime("%Y-%m-%d", time.localtime(info["saved_at"]))
+    return f"{info['name']} · {period} · {info['leaders']:,}명 · {saved}"
+
+def load_cached_result(state_key, prompt):
+    # 같은 프롬프트의 결과가 캐시에 있으면 버튼 없이 바로 표시 (세션당 프롬프트별 1회만 조회)
+    lookup_key = f"{state_key}_lookup"
+    key = cache_key(MODEL, prompt)
+    if not st.session_state.get(state_key) and st.session_state.get(lookup_key) != key:
+        st.session_state[lookup_key] = key
+        st.session_state[state_key] = get_cache().get(MODEL, prompt)
+
+def stream_to(placeholder, prompt, kind, force=False):
+    # 토큰이 도착하는 대로 placeholder에 표시하고 완성된 텍스트를 반환 (중지 버튼을 누르면 즉시 중단, 저장 안 함)
+    if not force and st.session_state.get("prefetch_on"):
+        # 같은 프롬프트를 미리 생성 중이면 요청을 다시 보내지 않고 그 결과를 기다림
+        # (PREFETCH_WAIT_SECONDS 안에 끝나지 않거나 실패하면 아래에서 직접 생성)
+        prefetcher = get_prefetcher(OPENAI_API_KEY)
+        if prefetcher.pending(prompt) is not None:
+            with placeholder.container(), st.spinner("미리 생성 중인 결과를 받아오는 중..."):
+                text = prefetcher.wait(prompt, timeout=PREFETCH_WAIT_SECONDS)
+            if text:
+                return text
+    gateway = get_gateway(OPENAI_API_KEY)
+    chunks = cached_stream(
+        MODEL, prompt, lambda: gateway.stream([{"role": "user", "content": prompt}], kind=kind), force=force
+    )
+    stop_key = f"stop_{kind}"
+    stopped = []
+
+    def until_stopped():
+        for chunk in chunks:
+            if stop_clicked(stop_key):
+                stopped.append(True)
+                return
+            yield chunk
+
+    with placeholder.container():
+        st.button("⏹ 생성 중지", key=stop_key)
+        try:
+            text = st.write_stream(until_stopped())
+        finally:
+            # 끝까지 받지 못한 스트림은 닫히면서 연결도 끊고 캐시에 저장하지 않음
+            chunks.close()
+    if stopped:
+        # 중단된 결과는 세션에도 남기지 않고, 대기 중인 요청(중지 버튼 클릭)으로 이 탭을 다시 그림
+        st.rerun(scope="fragment")
+    return text
+
+def stop_clicked(key):
+    # 대기 중인 다음 실행 요청에 key 버튼 클릭이 들어 있는지 확인 (위젯 ID는 key로 끝남)
+    # fragment 안의 위젯 클릭은 실행 중인 스크립트를 중단시키지 않으므로(Streamlit), 스트리밍 중에는 조각마다 직접 확인
+    # Streamlit 비공개 상태(ScriptRequests)를 읽으므로 requirements.txt에서 버전을 고정하고,
+    # 다른 버전이라 구조가 달라 읽지 못하면 클릭 없음으로 처리 (중지 버튼은 조각 사이가 아니라 스트리밍이 끝난 뒤 반영됨)
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType
+
+        requests = get_script_run_ctx().script_requests
+        with requests._lock:
+            if requests._state != ScriptRequestType.RERUN:
+                return False
+            states = requests._rerun_data.widget_states
+            return states is not None and any(w.id.endswith(f"-{key}") and w.trigger_value for w in states.widgets)
+    except Exception:
+        return False
+
+def update_prefetch(dataset, leader_options, leader_pos):
+    # 선택한 임원 + 목록상 다음 임원들의 요약/심층 분석을 백그라운드에서 미리 생성 (선택이 바뀔 때만 갱신)
+    session_id = st.session_state.setdefault("prefetch_session", uuid.uuid4().hex)
+    targets = []
+    if st.session_state.get("prefetch_on") and leader_pos is not None:
+        start = leader_options.index(leader_pos)
+        targets = leader_options[start:start + 1 + PREFETCH_AHEAD]
+    target_key = (dataset.file_hash, tuple(targets))
+    if st.session_state.get("prefetch_target") == target_key:
+        return
+    st.session_state.prefetch_target = target_key
+
+    jobs = []
+    for pos in targets:
+        prompts = leader_prompts(dataset, pos)
+        jobs += [(kind, prompts[kind]) for kind in ("summary", "analysis") if prompts[kind]]
+    # 목록에서 빠진 임원(이전 선택 등)의 작업은 이 호출에서 취소됨
+    get_prefetcher(OPENAI_API_KEY).update(session_id, jobs)
+
+def render_debug_panel(trace):
+    # 숨김 디버그 패널 (?debug=1): 이번 실행의 구간별 소요 시간, 메모리, 최근 LLM 호출
+    with st.expander("🛠️ 성능 계측 (이번 실행)"):
+        if trace is None:
+            st.caption("COACH_TELEMETRY=1 로 실행하면 구간별 소요 시간이 기록됩니다.")
+            return
+        st.caption(f"전체 {trace.duration * 1000:,.0f} ms · 메모리 {trace.memory_start:,.0f} → {trace.memory_end:,.0f} MB")
+        breakdown = stage_breakdown(trace)
+        if breakdown:
+            st.dataframe(
+                {"구간": list(breakdown), "ms": [round(t * 1000, 1) for t, _ in breakdown.values()], "횟수": [c for _, c in breakdown.values()]},
+                hide_index=True, use_container_width=True,
+            )
+        if OPENAI_API_KEY:
+            recent = get_gateway(OPENAI_API_KEY).metrics()[-5:]
+            for m in reversed(recent):
+                ttft = f"{m['ttft']:.2f}s" if m["ttft"] is not None else "-"
+                st.caption(f"{m['kind']} · {m['latency']:.2f}s (TTFT {ttft}) · 토큰 {m['prompt_tokens'] or 0}/{m['completion_tokens'] or 0}{'' if m['ok'] else ' · 실패'}")
+
+@st.fragment(run_every=PREFETCH_POLL_SECONDS)
+def watch_prefetch(prompts):
+    # 현재 임원의 미리 생성 작업이 끝나면 화면 전체를 다시 그려 결과를 바로 표시
+    # 주기적으로 세션이 열려 있음을 알려, 탭을 닫은 세션의 작업은 만료 후 취소되게 함
+    prefetcher = get_prefetcher(OPENAI_API_KEY)
+    prefetcher.touch(st.session_state.setdefault("prefetch_session", uuid.uuid4().hex))
+    waiting = [k for k, p in prompts.items() if p and not st.session_state.get(k) and prefetcher.pending(p) is not None]
+    finished = [k for k in st.session_state.get("prefetch_waiting", []) if k not in waiting]
+    st.session_state.prefetch_waiting = waiting
+    if waiting:
+        st.caption("⚡ AI 결과 미리 생성 중...")
+    if finished:
+        for state_key in finished:
+            st.session_state[f"{state_key}_lookup"] = None
+        st.rerun()
 
 # --- 사이드바 ---
 with st.sidebar:
     st.title("👑 임원 리더십 코칭")
-    st.info("리더십 진단 결과(Excel)를 업로드하세요.")
-    uploaded_file = st.file_uploader("엑셀 파일 업로드", type=["xlsx", "csv"])
+    st.info("리더십 진단 결과(Excel)를 업로드하세요. 연도별 파일을 여러 개 올리면 자동으로 합쳐집니다.")
+    uploaded_files = st.file_uploader("엑셀 파일 업로드", type=["xlsx", "csv"], accept_multiple_files=True)
+    # 이전에 올린 파일(파싱 결과 보관본)은 다시 올리지 않고 골라서 합침 (앱 재시작 후에도 유지)
+    # 보관 목록은 서버 전체 공용: 이 서버에서 누가 올렸든 모두 표시됨 (사용자별 구분 없음)
+    stored_info = {info["file_hash"]: info for info in stored_files()}
+    stored_hashes = st.multiselect(
+        "이전에 올린 파일 포함", list(stored_info), format_func=lambda h: stored_label(stored_info[h]), key="stored_files",
+        help="지난 연도 파일을 다시 올리지 않아도 이번 파일과 임원 기준으로 합쳐 봅니다. 이 서버에 올라온 파일이 사용자 구분 없이 모두 표시됩니다.",
+    ) if stored_info else []
     
     selected_leader = None
-    df = None
+    dataset = None
     
-    if uploaded_file:
-        df = load_data(uploaded_file)
-        if df is not None:
-            name_col = next((c for c in df.columns if "이름" in c or "Name" in c), df.columns[1])
-            leader_list = df[name_col].unique().tolist()
-            selected_leader_name = st.selectbox("대상 임원 선택", leader_list)
-            leader_data = df[df[name_col] == selected_leader_name].iloc[0]
+    if uploaded_files or stored_hashes:
+        dataset = load_data(uploaded_files or [], stored_hashes)
+        if dataset is not None:
+            leaders = dataset.leaders
+            # 명단이 크면 이름/초성/사번 검색 결과만 선택 목록에 올림 (색인은 데이터셋당 한 번 생성)
+            leader_query = st.text_input("임원 검색 (이름·초성·사번)") if len(leaders) > LEADER_LIST_LIMIT else ""
+            leader_options = leaders.search(leader_query, limit=LEADER_LIST_LIMIT)
+            if len(leaders) > LEADER_LIST_LIMIT and not leader_query:
+                st.caption(f"전체 {len(leaders):,}명 중 {len(leader_options)}명 표시 · 검색어로 좁혀 보세요.")
+            # 주소의 ?leader=(사번/이름)로 임원을 다시 찾음: 링크 공유, 파일 추가로 행 위치가 바뀌어도 같은 임원 유지
+            wanted = leaders.lookup(st.query_params.get("leader", ""))
+            if wanted is not None and wanted not in leader_options and not leader_query:
+                leader_options = [wanted, *leader_options]
+            leader_pos = st.selectbox(
+                "대상 임원 선택", leader_options, format_func=lambda pos: leaders.labels[pos],
+                index=leader_options.index(wanted) if wanted in leader_options else 0,
+            )
+            if leader_pos is not None:
+                st.query_params["leader"] = leaders.key(leader_pos)
+            selected_leader_name = leaders.names[leader_pos] if leader_pos is not None else None
+
+            # 비교 집단: 전체 임원 또는 부문 등 메타 값이 같은 임원들
+            peer_fields = dataset.cohort.peer_fields(exclude=(dataset.name_col, find_id_column(dataset.columns[0])))
+            compare_field = st.selectbox(
+                "비교 집단", [None, *peer_fields], format_func=lambda f: "전체 임원" if f is None else f"같은 {f}"
+            )
             
-            # 다른 임원 선택 시 세션 초기화 로직
+            # 다른 임원 선택 시(또는 새 파일로 해당 임원 데이터가 바뀐 경우) 세션 초기화 로직
+            leader_key = (leader_pos, dataset.leader_version(leader_pos)) if leader_pos is not None else None
             if "current_leader" not in st.session_state:
                 st.session_state.current_leader = None
-            if selected_leader_name != st.session_state.current_leader:
-                st.session_state.current_leader = selected_leader_name
+            if leader_key != st.session_state.current_leader:
+                st.session_state.current_leader = leader_key
                 st.session_state.dash_summary = None
                 st.session_state.qualitative_analysis = None
+                st.session_state.dash_summary_lookup = None
+                st.session_state.qualitative_analysis_lookup = None
                 st.session_state.messages = []
+                st.session_state.chat_summary = None
+                st.session_state.chat_summarized = 0
             
             if not OPENAI_API_KEY:
                 st.warning("⚠️ API Key 미설정 (AI 기능 제한)")
+            
+            cache_stats = get_cache().stats()
+            st.caption(f"🗄️ AI 결과 캐시 {cache_stats['entries']:,}건 · 적중률 {cache_stats['hit_rate']:.0%}")
 
-# --- 메인 로직 ---
-if df is not None and selected_leader_name:
-    # 1. 컬럼 파싱
-    meta_cols, member_map, peer_map, member_text_map, peer_text_map = parse_columns(df)
-    sorted_years = sorted(member_map.keys())
+            if OPENAI_API_KEY:
+                st.toggle("⚡ AI 결과 미리 생성", key="prefetch_on", help=f"임원을 고르면 요약/심층 분석을 바로 백그라운드에서 생성합니다. (목록의 다음 {PREFETCH_AHEAD}명 포함)")
+                if st.session_state.prefetch_on or st.session_state.get("prefetch_target"):
+                    update_prefetch(dataset, leader_options, leader_pos)
+
+# --- 임원별 화면 데이터 (데이터셋 해시 + 임원 단위로 한 번만 계산) ---
+@st.cache_data(max_entries=512, show_spinner=False)
+def leader_view(dataset_hash, leader_pos, compare_field, _dataset):
+    sorted_years = _dataset.years
     latest_year = sorted_years[-1]
+
+    # 비교 집단 대비 백분위/사분위 (로드 시 만든 정렬 배열에서 이진 탐색)
+    with span("standing"):
+        standing = _dataset.cohort.standing(leader_pos, compare_field)
+        rank_table = (
+            standing.xs(latest_year, level=1).drop(index="overall", level=0)
+            .droplevel(0)[["score", "percentile", "band", "median", "n"]].dropna(subset=["score"])
+            .rename(columns={"score": "점수", "percentile": "백분위", "band": "구간", "median": "집단 중앙값", "n": "응답 임원 수"})
+        )
     
-    # 2. 역량 매핑 & 점수 추출
-    raw_competencies = [col.replace(f"_{latest_year}", "") for col in member_map[latest_year]]
-    norm_comp_map = {normalize_text(c): c for c in raw_competencies}
-    
-    grouped_scores = {}
-    detailed_scores = {} 
+    # 점수 조회 (전체 임원 점수 테이블에서 행 조회)
+    with span("scoring"):
+        detailed_scores, grouped_scores, avg_scores = leader_scores(_dataset.cohort, leader_pos)
 
-    for year in sorted_years:
-        year_group_data = {}
-        year_detail_data = {}
+        curr_score = avg_scores[latest_year]
+        prev_year = sorted_years[-2] if len(sorted_years) > 1 else None
+        delta_total = (curr_score - avg_scores[prev_year]) if prev_year else 0
         
-        for col in member_map[year]:
-            if "_동료_" in col: continue
-            comp_name = col.replace(f"_{year}", "")
-            val = leader_data[col]
-            if pd.notna(val) and val > 0:
-                year_detail_data[comp_name] = val
-            else:
-                year_detail_data[comp_name] = 0
-        detailed_scores[year] = year_detail_data
+        latest_series, top_comp, bot_comp = strongest_weakest(detailed_scores[latest_year])
+
+    with span("text"):
+        latest_texts, raw_preview = collect_latest_feedback(_dataset.store, leader_pos, latest_year)
+        # 주관식 키워드 집계 (로드 시 만든 전체 임원 빈도 행렬에서 해당 임원 행만 조회)
+        keywords = leader_keywords(_dataset.keywords, leader_pos, sorted_years)
+        data_context = build_data_context(format_keyword_table(keywords), avg_scores, latest_year, top_comp, bot_comp)
+
+    with span("figures"):
+        fig_line = trend_figure(sorted_years, avg_scores, standing)
+        fig_radar = radar_figure(sorted_years, grouped_scores, latest_year, standing)
+
+    return {
+        "sorted_years": sorted_years,
+        "latest_year": latest_year,
+        "prev_year": prev_year,
+        "grouped_scores": grouped_scores,
+        "avg_scores": avg_scores,
+        "curr_score": curr_score,
+        "delta_total": delta_total,
+        "latest_series": latest_series,
+        "top_comp": top_comp,
+        "bot_comp": bot_comp,
+        "standing": standing.loc[("overall", latest_year, OVERALL)],
+        "rank_table": rank_table,
+        "fig_line": fig_line,
+        "fig_radar": fig_radar,
+        "latest_texts": latest_texts,
+        "raw_preview": raw_preview,
+        "summary_prompt": build_summary_prompt(latest_year, latest_texts) if latest_texts.strip() else None,
+        "keywords": keywords,
+        "data_context": data_context,
+        "analysis_prompt": build_analysis_prompt(data_context),
+    }
+
+# --- 탭별 화면 (fragment: 버튼 클릭/대화 입력 시 해당 탭만 다시 실행) ---
+@st.fragment
+@traced("overview")
+def render_overview(view):
+    latest_year, prev_year = view["latest_year"], view["prev_year"]
+    latest_series, top_comp, bot_comp = view["latest_series"], view["top_comp"], view["bot_comp"]
+    raw_preview = view["raw_preview"]
+
+    st.subheader("Overview (구성원 응답 기준)")
+    
+    m1, m2, m3 = st.columns(3)
+    
+    m1.metric(f"{latest_year} 종합 점수", f"{view['curr_score']:.2f}", f"{view['delta_total']:+.2f} ({prev_year} 대비)" if prev_year else None)
+    m2.metric("최고 강점", top_comp, f"{latest_series[top_comp]:.1f}" if top_comp != "-" else "-")
+    m3.metric("보완 필요", bot_comp, f"{latest_series[bot_comp]:.1f}" if bot_comp != "-" else "-", delta_color="inverse")
+    standing = view["standing"]
+    if standing["percentile"] == standing["percentile"]:
+        m1.caption(f"{standing['group']} {standing['n']:,}명 중 {standing['band']} (백분위 {standing['percentile']:.0f})")
+    
+    st.divider()
+    
+    c1, c2 = st.columns([1, 1])
+    
+    with c1:
+        st.markdown("##### 📅 리더십 종합 점수 추이")
+        st.plotly_chart(view["fig_line"], use_container_width=True)
         
-        for group_name, sub_items in COMPETENCY_GROUPS.items():
-            scores = []
-            for item in sub_items:
-                norm_item = normalize_text(item)
-                target_col = None
-                if item in year_detail_data: target_col = item
-                elif norm_item in norm_comp_map and norm_comp_map[norm_item] in year_detail_data:
-                    target_col = norm_comp_map[norm_item]
-                
-                if target_col:
-                    val = year_detail_data[target_col]
-                    if val > 0: scores.append(val)
+    with c2:
+        st.markdown(f"##### 🕸️ 리더십 영역별 변화 ({latest_year})")
+        st.plotly_chart(view["fig_radar"], use_container_width=True)
+
+    with st.expander(f"📊 {standing['group']} 대비 역량별 위치 ({latest_year})"):
+        st.dataframe(view["rank_table"].style.format({"점수": "{:.2f}", "백분위": "{:.0f}", "집단 중앙값": "{:.2f}"}), use_container_width=True)
+
+    st.divider()
+    st.markdown(f"##### 💬 {latest_year} 주요 피드백 하이라이트")
+
+    if view["summary_prompt"]:
+        if "dash_summary" not in st.session_state:
+            st.session_state.dash_summary = None
+        summary_prompt = view["summary_prompt"]
+        load_cached_result("dash_summary", summary_prompt)
+
+        if st.session_state.dash_summary:
+            st.info(st.session_state.dash_summary)
+            with st.expander("원문 피드백 보기"):
+                for c in raw_preview:
+                    st.markdown(f"- {c}")
+        else:
+            st.markdown("<span style='color:#666; font-size:0.9rem;'>최근 평가에 접수된 주관식 코멘트입니다.</span>", unsafe_allow_html=True)
             
-            if scores: year_group_data[group_name] = sum(scores) / len(scores)
-            else: year_group_data[group_name] = 0.0
-        
-        grouped_scores[year] = year_group_data
+            for c in raw_preview[:3]: 
+                st.markdown(f"> {c}")
+            
+            if len(raw_preview) > 3:
+                st.caption(f"...외 {len(raw_preview)-3}건의 피드백이 있습니다.")
+            
+            st.write("")
+            if st.button("🤖 AI 3줄 핵심 요약 보기"):
+                if OPENAI_API_KEY:
+                    try:
+                        summary_box = st.empty()
+                        st.session_state.dash_summary = stream_to(summary_box, summary_prompt, "summary")
+                        summary_box.info(st.session_state.dash_summary)
+                    except Exception as e:
+                        st.error(f"오류: {e}")
+                else:
+                    st.warning("API Key가 필요합니다.")
+    else:
+        st.info("해당 연도의 주관식 데이터가 없습니다.")
+
+@st.fragment
+@traced("qualitative")
+def render_qualitative(view):
+    st.subheader("📝 주관식 피드백 심층 분석")
+
+    keywords = view["keywords"]
+    st.markdown("##### 🔑 연도별 주관식 키워드")
+    st.dataframe(keywords["yearly"], use_container_width=True)
+    period = f"{keywords['first_year']} → {keywords['last_year']}"
+    k1, k2 = st.columns(2)
+    k1.markdown(f"**📈 증가 ({period})**  \n{', '.join(keywords['rising']) or '-'}")
+    k1.markdown(f"**📉 감소 ({period})**  \n{', '.join(keywords['falling']) or '-'}")
+    k2.markdown(f"**👤 구성원이 더 자주 언급**  \n{', '.join(keywords['member_more']) or '-'}")
+    k2.markdown(f"**🤝 동료가 더 자주 언급**  \n{', '.join(keywords['peer_more']) or '-'}")
+    st.divider()
+    
+    analysis_prompt = view["analysis_prompt"]
+    load_cached_result("qualitative_analysis", analysis_prompt)
+
+    # 분석 결과가 이미 있는지 확인하여 버튼 텍스트 변경
+    # 재실행 버튼은 캐시를 건너뛰고 새로 생성 (force regenerate)
+    regenerate = bool(st.session_state.get('qualitative_analysis'))
+    button_text = "🤖 AI 심층 분석 재실행" if regenerate else "🤖 AI 심층 분석 실행 (3-Point Analysis)"
+
+    analysis_clicked = st.button(button_text)
+    analysis_box = st.empty()
+    if analysis_clicked:
+        if not OPENAI_API_KEY:
+            st.error("API Key가 필요합니다.")
+        else:
+            try:
+                # 생성되는 대로 결과 영역에 바로 표시하고, 완료되면 세션에 저장 (전체 rerun 없음)
+                st.session_state['qualitative_analysis'] = stream_to(analysis_box, analysis_prompt, "analysis", force=regenerate)
+            except Exception as e:
+                st.error(f"오류 발생: {e}")
+    
+    # 세션에 저장된 분석 결과가 있으면 버튼 밖에서도 항상 화면에 표시
+    if st.session_state.get('qualitative_analysis'):
+        with analysis_box.container():
+            st.success("분석 완료")
+            st.markdown(st.session_state['qualitative_analysis'])
+    
+    with st.expander("원본 데이터 보기"):
+        st.text(view["data_context"])
 
-    # Common Stats
-    avg_scores = {}
-    for y in sorted_years:
-        vals = [v for v in detailed_scores[y].values() if v > 0]
-        avg_scores[y] = sum(vals) / len(vals) if vals else 0
+@st.fragment
+@traced("coaching")
+def render_coaching(view, leader_name):
+    latest_year, curr_score, delta_total = view["latest_year"], view["curr_score"], view["delta_total"]
 
-    curr_score = avg_scores[latest_year]
-    prev_year = sorted_years[-2] if len(sorted_years) > 1 else None
-    delta_total = (curr_score - avg_scores[prev_year]) if prev_year else 0
+    st.subheader("💬 AI 리더십 코칭")
+    chat_container = st.container()
     
-    latest_series = pd.Series(detailed_scores[latest_year])
-    latest_series = latest_series[latest_series > 0]
+    if "messages" not in st.session_state or len(st.session_state.messages) == 0:
+        st.session_state.messages = []
+        welcome = f"{leader_name} 임원님, 반갑습니다. 3년치 리더십 분석을 완료했습니다.\n\n"
+        welcome += f"최근({latest_year}) 종합 점수는 **{curr_score:.2f}점**입니다. "
+        if delta_total > 0: welcome += "전년 대비 상승세입니다. 📈\n\n"
+        elif delta_total < 0: welcome += "전년 대비 하락세가 관찰됩니다. 📉\n\n"
+        
+        welcome += "현재 가장 고민되시는 리더십 이슈는 무엇인가요? 편하게 말씀해 주시면 대화를 시작하겠습니다.\n\n"
+        welcome += """---
+        💡 **추가 제안 (클릭하여 복사 후 질문해주세요)**
+        * 📚 **이론 학습:** 현재 약점과 관련된 최신 리더십 이론 추천
+        * 🎬 **영상 추천:** 리더십 개발을 위한 TED 강연 추천
+        * 🗓️ **W/S 제안:** 조직문화 개선을 위한 워크숍 아젠다 제안
+        * 🎯 **SKMS 적용:** 사내 철학(VWBE, SUPEX 등)을 내 팀에 적용하는 방법
+        (원하시는 내용을 질문해 주시면 상세히 안내해 드립니다)
+        """
+        st.session_state.messages.append({"role": "assistant", "content": welcome})
+        
+    with chat_container:
+        for msg in st.session_state.messages:
+            with st.chat_message(msg["role"]):
+                st.write(msg["content"])
     
-    if not latest_series.empty:
-        top_comp = latest_series.idxmax()
-        bot_comp = latest_series.idxmin()
-    else:
-        top_comp, bot_comp = "-", "-"
+    if prompt := st.chat_input("질문 입력..."):
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        with chat_container:
+            with st.chat_message("user"):
+                st.write(prompt)
+        
+        if OPENAI_API_KEY:
+            try:
+                gateway = get_gateway(OPENAI_API_KEY)
+                qual_context = st.session_state.get('qualitative_analysis') or "주관식 분석 결과 없음"
+                
+                # 고정 시스템 메시지(가이드+SKMS) → 임원 데이터 → 이전 대화 요약 → 최근 대화 순으로 토큰 예산 안에서 구성
+                leader_context = build_leader_context(leader_name, view['avg_scores'], view['top_comp'], view['bot_comp'], qual_context)
+                summarized = st.session_state.get('chat_summarized', 0)
+                msgs = build_messages(
+                    build_system_prefix(SKMS_KNOWLEDGE_BASE), leader_context,
+                    st.session_state.get('chat_summary'), st.session_state.messages[summarized:]
+                )
+                
+                with chat_container:
+                    with st.chat_message("assistant"):
+                        res = st.write_stream(gateway.stream(msgs, kind="chat"))
+                st.session_state.messages.append({"role": "assistant", "content": res})
+
+                # 답변 표시 후, 대화가 길어졌으면 오래된 턴을 누적 요약으로 압축 (화면에는 전체 대화 유지)
+                st.session_state.chat_summary, st.session_state.chat_summarized = compact_history(
+                    st.session_state.messages, st.session_state.get('chat_summary'), summarized,
+                    lambda summary, turns: gateway.complete(build_summary_request(summary, turns), kind="chat_summary"),
+                )
+            except Exception as e:
+                st.error(f"오류: {e}")
+        else:
+            st.warning("API Key 미설정")
+
+# --- 메인 로직 ---
+if dataset is not None and selected_leader_name:
+    view = leader_view(dataset.file_hash, leader_pos, compare_field, dataset)
+    if OPENAI_API_KEY and st.session_state.get("prefetch_on"):
+        with st.sidebar:
+            watch_prefetch({"dash_summary": view["summary_prompt"], "qualitative_analysis": view["analysis_prompt"]})
 
     # --- UI ---
     st.title(f"📊 {selected_leader_name} 님 리더십 진단 분석")
@@ -216,246 +527,15 @@ if df is not None and selected_leader_name:
     
     # [TAB 1] Overview
     with tab1:
-        st.subheader("Overview (구성원 응답 기준)")
-        
-        m1, m2, m3 = st.columns(3)
-        
-        m1.metric(f"{latest_year} 종합 점수", f"{curr_score:.2f}", f"{delta_total:+.2f} ({prev_year} 대비)" if prev_year else None)
-        m2.metric("최고 강점", top_comp, f"{latest_series[top_comp]:.1f}" if top_comp != "-" else "-")
-        m3.metric("보완 필요", bot_comp, f"{latest_series[bot_comp]:.1f}" if bot_comp != "-" else "-", delta_color="inverse")
-        
-        st.divider()
-        
-        c1, c2 = st.columns([1, 1])
-        
-        with c1:
-            st.markdown("##### 📅 리더십 종합 점수 추이")
-            trend_df = pd.DataFrame({"Year": sorted_years, "Score": [avg_scores[y] for y in sorted_years]})
-            fig_line = px.line(trend_df, x="Year", y="Score", markers=True, range_y=[0, 5.5], text="Score")
-            fig_line.update_traces(line_color='#2563eb', line_width=3, textposition="top center", texttemplate='%{text:.2f}')
-            st.plotly_chart(fig_line, use_container_width=True)
-            
-        with c2:
-            st.markdown(f"##### 🕸️ 리더십 영역별 변화 ({latest_year})")
-            fig_radar = go.Figure()
-            colors = ['#cbd5e1', '#94a3b8', '#2563eb'] 
-            cats = list(COMPETENCY_GROUPS.keys())
-            for i, year in enumerate(sorted_years):
-                vals = [grouped_scores[year].get(cat, 0) for cat in cats]
-                vals += [vals[0]]
-                fig_radar.add_trace(go.Scatterpolar(r=vals, theta=cats+[cats[0]], fill='toself' if year==latest_year else 'none', name=year, line_color=colors[i] if i<3 else 'black'))
-            fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 5])), showlegend=True, margin=dict(t=20, b=20, l=20, r=20))
-            st.plotly_chart(fig_radar, use_container_width=True)
-
-        st.divider()
-        st.markdown(f"##### 💬 {latest_year} 주요 피드백 하이라이트")
-        
-        latest_texts = ""
-        raw_preview = []
-        if latest_year in member_text_map:
-            for col in member_text_map[latest_year]:
-                val = leader_data[col]
-                if pd.notna(val) and str(val).strip() not in ["0", "-", ""]:
-                    latest_texts += f"- [구성원] {val}\n"
-                    raw_preview.append(f"👤 **구성원:** {val}")
-                    
-        if latest_year in peer_text_map:
-            for col in peer_text_map[latest_year]:
-                val = leader_data[col]
-                if pd.notna(val) and str(val).strip() not in ["0", "-", ""]:
-                    latest_texts += f"- [동료] {val}\n"
-                    raw_preview.append(f"🤝 **동료:** {val}")
-
-        if latest_texts.strip():
-            if "dash_summary" not in st.session_state:
-                st.session_state.dash_summary = None
-
-            if st.session_state.dash_summary:
-                st.info(st.session_state.dash_summary)
-                with st.expander("원문 피드백 보기"):
-                    for c in raw_preview:
-                        st.markdown(f"- {c}")
-            else:
-                st.markdown("<span style='color:#666; font-size:0.9rem;'>최근 평가에 접수된 주관식 코멘트입니다.</span>", unsafe_allow_html=True)
-                
-                for c in raw_preview[:3]: 
-                    st.markdown(f"> {c}")
-                
-                if len(raw_preview) > 3:
-                    st.caption(f"...외 {len(raw_preview)-3}건의 피드백이 있습니다.")
-                
-                st.write("")
-                if st.button("🤖 AI 3줄 핵심 요약 보기"):
-                    if OPENAI_API_KEY:
-                        with st.spinner("가장 중요한 핵심 내용을 요약하고 있습니다..."):
-                            try:
-                                client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                                prompt = f"""
-                                다음은 특정 임원의 {latest_year}년도 다면평가 주관식 피드백 원문입니다.
-                                대시보드에서 한눈에 볼 수 있도록 다음 3가지 항목으로 아주 간결하게(각 1줄씩) 요약해주세요.
-                                1. 주요 강점: 
-                                2. 주요 보완점: 
-                                3. 종합 제언: 
-                                
-                                [피드백 원문]
-                                {latest_texts}
-                                """
-                                res = client.chat.completions.create(
-                                    model="gpt-5-mini",
-                                    messages=[{"role": "user", "content": prompt}]
-                                )
-                                st.session_state.dash_summary = res.choices[0].message.content
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"오류: {e}")
-                    else:
-                        st.warning("API Key가 필요합니다.")
-        else:
-            st.info("해당 연도의 주관식 데이터가 없습니다.")
+        render_overview(view)
 
     # [TAB 2] 주관식 심층분석
     with tab2:
-        st.subheader("📝 주관식 피드백 심층 분석")
-        
-        data_context = ""
-        
-        data_context += "### [1] 구성원 주관식 응답 (3개년)\n"
-        for year in sorted_years:
-            data_context += f"<{year}년 구성원>\n"
-            if year in member_text_map:
-                for col in member_text_map[year]:
-                    val = leader_data[col]
-                    if pd.notna(val) and str(val).strip() not in ["0", "-", ""]:
-                        clean_col = col.replace(f"_{year}", "")
-                        data_context += f"- {clean_col}: {val}\n"
-        
-        data_context += "\n### [2] 동료 임원 주관식 응답 (3개년)\n"
-        for year in sorted_years:
-            data_context += f"<{year}년 동료>\n"
-            if year in peer_text_map:
-                for col in peer_text_map[year]:
-                    val = leader_data[col]
-                    if pd.notna(val) and str(val).strip() not in ["0", "-", ""]:
-                        clean_col = col.replace(f"_동료_{year}", "")
-                        data_context += f"- {clean_col}: {val}\n"
-        
-        data_context += "\n### [3] 객관식 점수 변화 추이\n"
-        data_context += f"- 종합 점수 변화: {avg_scores}\n"
-        data_context += f"- {latest_year}년 최고 강점: {top_comp}, 보완 필요: {bot_comp}\n"
-
-        # 분석 결과가 이미 있는지 확인하여 버튼 텍스트 변경
-        button_text = "🤖 AI 심층 분석 재실행" if st.session_state.get('qualitative_analysis') else "🤖 AI 심층 분석 실행 (3-Point Analysis)"
-
-        if st.button(button_text):
-            if not OPENAI_API_KEY:
-                st.error("API Key가 필요합니다.")
-            else:
-                with st.spinner("AI가 3년치 데이터와 정성/정량 데이터를 통합 분석 중입니다..."):
-                    try:
-                        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                        prompt = f"""
-                        당신은 대기업 임원 리더십 평가 전문가입니다. 
-                        제공된 3년치 '객관식 점수'와 '주관식 코멘트(구성원/동료)'를 통합 분석하여 아래 3가지 항목으로 심층 리포트를 작성해주세요.
-
-                        1. **3개년 주관식 키워드 주요 변화**
-                           - 연도별로 주관식에서 자주 등장하는 긍정/부정 키워드가 어떻게 달라졌는지 분석하세요.
-                           - 예: "22년에는 '추진력'이 강조되었으나, 24년에는 '소통 부재'가 키워드로 부상함"
-
-                        2. **변화 원인 추적 (정량+정성 통합)**
-                           - 객관식 점수의 상승/하락 원인을 주관식 코멘트에서 찾아 연결하세요.
-                           - 예: "전략적 Insight 점수가 하락한 원인은, 구성원 코멘트에서 '구체적 비전 공유 부족'이 반복 언급된 것과 연관됨"
-
-                        3. **구성원 vs 동료 인식 비교**
-                           - 동일한 리더십에 대해 구성원과 동료 임원이 바라보는 시각 차이(Gap)를 분석하세요.
-                           - 예: "동료들은 '협업 능력'을 높게 평가하나, 구성원들은 '팀 내 소통'을 아쉬워하는 경향이 있음"
-
-                        [분석 대상 데이터]
-                        {data_context}
-                        """
-                        
-                        res = client.chat.completions.create(
-                            model="gpt-5-mini",
-                            messages=[{"role": "user", "content": prompt}]
-                        )
-                        # 세션에 결과 저장 후 화면 강제 새로고침(rerun)
-                        st.session_state['qualitative_analysis'] = res.choices[0].message.content 
-                        st.rerun() 
-                    except Exception as e:
-                        st.error(f"오류 발생: {e}")
-        
-        # 세션에 저장된 분석 결과가 있으면 버튼 밖에서도 항상 화면에 표시
-        if st.session_state.get('qualitative_analysis'):
-            st.success("분석 완료")
-            st.markdown(st.session_state['qualitative_analysis'])
-        
-        with st.expander("원본 데이터 보기"):
-            st.text(data_context)
+        render_qualitative(view)
 
     # [TAB 3] AI 코칭
     with tab3:
-        st.subheader("💬 AI 리더십 코칭")
-        chat_container = st.container()
-        
-        if "messages" not in st.session_state or len(st.session_state.messages) == 0:
-            st.session_state.messages = []
-            welcome = f"{selected_leader_name} 임원님, 반갑습니다. 3년치 리더십 분석을 완료했습니다.\n\n"
-            welcome += f"최근({latest_year}) 종합 점수는 **{curr_score:.2f}점**입니다. "
-            if delta_total > 0: welcome += "전년 대비 상승세입니다. 📈\n\n"
-            elif delta_total < 0: welcome += "전년 대비 하락세가 관찰됩니다. 📉\n\n"
-            
-            welcome += "현재 가장 고민되시는 리더십 이슈는 무엇인가요? 편하게 말씀해 주시면 대화를 시작하겠습니다.\n\n"
-            welcome += """---
-            💡 **추가 제안 (클릭하여 복사 후 질문해주세요)**
-            * 📚 **이론 학습:** 현재 약점과 관련된 최신 리더십 이론 추천
-            * 🎬 **영상 추천:** 리더십 개발을 위한 TED 강연 추천
-            * 🗓️ **W/S 제안:** 조직문화 개선을 위한 워크숍 아젠다 제안
-            * 🎯 **SKMS 적용:** 사내 철학(VWBE, SUPEX 등)을 내 팀에 적용하는 방법
-            (원하시는 내용을 질문해 주시면 상세히 안내해 드립니다)
-            """
-            st.session_state.messages.append({"role": "assistant", "content": welcome})
-            
-        with chat_container:
-            for msg in st.session_state.messages:
-                with st.chat_message(msg["role"]):
-                    st.write(msg["content"])
-        
-        if prompt := st.chat_input("질문 입력..."):
-            st.session_state.messages.append({"role": "user", "content": prompt})
-            with chat_container:
-                with st.chat_message("user"):
-                    st.write(prompt)
-            
-            if OPENAI_API_KEY:
-                try:
-                    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                    qual_context = st.session_state.get('qualitative_analysis', "주관식 분석 결과 없음")
-                    
-                    sys_msg = f"""
-                    당신은 임원 전용 리더십 코치입니다. 대상: {selected_leader_name}
-                    
-                    [데이터] 점수: {avg_scores}, 강점: {top_comp}, 약점: {bot_comp}
-                    [주관식 분석] {qual_context}
-                    
-                    {SKMS_KNOWLEDGE_BASE}
-                    
-                    [가이드]
-                    1. **전문가 페르소나:** 깊이 있는 통찰 제공.
-                    2. **사내 철학 연계:** 질문에 답변할 때 필요하다면 [SKMS 및 사내 고유 철학 핵심 요약]의 내용(VWBE, SUPEX, 구성원 행복 등)을 자연스럽게 인용하여 조언하세요. 
-                    3. **추가 제안:** 필요 시 이론/영상/워크숍 추천.
-                    4. **Next Step:** 답변 끝에 항상 코칭 질문(GROW 등)을 던져 대화를 이어나갈 것. (문구: 해당 질문에 답을 해주시면 다음 단계로 이어나가 보겠습니다)
-                    """
-                    
-                    msgs = [{"role": "system", "content": sys_msg}] + st.session_state.messages
-                    
-                    with chat_container:
-                        with st.chat_message("assistant"):
-                            stream = client.chat.completions.create(model="gpt-5-mini", messages=msgs, stream=True)
-                            res = st.write_stream(stream)
-                    st.session_state.messages.append({"role": "assistant", "content": res})
-                except Exception as e:
-                    st.error(f"오류: {e}")
-            else:
-                st.warning("API Key 미설정")
+        render_coaching(view, selected_leader_name)
 
 # --- 데이터가 없을 때 (초기 랜딩 화면) ---
 else:
@@ -482,3 +562,9 @@ else:
         3. 업로드가 완료되면, 분석 대상이 되는 **임원 이름을 선택**하세요.
         """)
 
+# --- 성능 계측 마무리 (JSONL/Prometheus 파일 기록) ---
+finish_trace(rerun_trace)
+if st.query_params.get("debug") == "1":
+    with st.sidebar:
+        render_debug_panel(rerun_trace)
+
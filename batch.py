@@ -0,0 +1,219 @@
+"""
+코칭 시즌 전에 전체 임원의 AI 3줄 요약/심층 분석을 미리 생성해 결과 캐시(llm_cache)에 채워 두는 배치 도구입니다.
+Streamlit 없이 실행되며, 앱과 같은 컬럼 파싱/프롬프트 구성을 사용하므로 앱에서는 바로 캐시 적중됩니다.
+
+사용 예:
+    python batch.py 리더십진단_22-24.xlsx --concurrency 8 --rpm 120
+    python batch.py 22년.xlsx 23년.xlsx 24년.xlsx --base-url http://127.0.0.1:8000/v1   # 로컬 stub 서버
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tomllib
+
+import openai
+
+from dataset import get_dataset
+from llm_cache import cache_key, get_cache
+from llm_gateway import RETRYABLE_ERRORS, backoff_delay
+from prompts import MODEL, leader_prompts
+
+CHECKPOINT_PATH = os.path.join(".cache", "batch_checkpoint.jsonl")
+KINDS = ("summary", "analysis")
+
+
+class TokenBucket:
+    """
+    분당 요청 수(rpm) 제한용 토큰 버킷입니다. 순간적으로는 capacity만큼 몰아서 보낼 수 있습니다.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def load_api_key():
+    # 환경변수 우선, 없으면 앱과 같은 .streamlit/secrets.toml 의 JYL 키 사용
+    if os.environ.get("OPENAI_API_KEY"):
+        return os.environ["OPENAI_API_KEY"]
+    try:
+        with open(os.path.join(".streamlit", "secrets.toml"), "rb") as f:
+            return tomllib.load(f).get("JYL")
+    except FileNotFoundError:
+        return None
+
+
+def load_failures(path):
+    """
+    체크포인트에서 마지막 기록이 실패인 결과 키를 모읍니다. (재실행 시 재시도 건수 안내용)
+    완료 여부는 체크포인트가 아니라 결과 캐시로 판단합니다. 캐시 LRU 정리로 지워진 결과는 다시 생성해야 하므로
+    """
+    status = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 중단 시 잘린 마지막 줄
+                status[record["key"]] = record.get("status")
+    return {key for key, s in status.items() if s == "failed"}
+
+
+def plan_jobs(dataset, kinds, limit=None):
+    """
+    생성할 (행 위치, 종류, 프롬프트) 목록을 만듭니다. 결과 캐시에 이미 있는 결과는 건너뜁니다.
+    """
+    cache = get_cache()
+    jobs, skipped = [], 0
+    rows = range(len(dataset.leaders))
+    for row in rows[:limit] if limit else rows:
+        prompts = leader_prompts(dataset, row)
+        for kind in kinds:
+            prompt = prompts[kind]
+            if prompt is None:
+                continue
+            # 적중률/최근 사용 시각을 건드리지 않도록 contains로 확인 (앱의 LRU 순서 유지)
+            if cache.contains(MODEL, prompt):
+                skipped += 1
+                continue
+            jobs.append((row, kind, prompt))
+    return jobs, skipped
+
+
+async def run_jobs(jobs, client, concurrency, rpm, retries, checkpoint_path, on_progress=None):
+    cache = get_cache()
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rpm)
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+    stats = {"done": 0, "failed": 0}
+    done_rows, failed_rows = set(), set()
+
+    async def run_one(row, kind, prompt):
+        key = cache_key(MODEL, prompt)
+        text, error = None, None
+        async with semaphore:
+            for attempt in range(retries + 1):
+                await bucket.acquire()
+                try:
+                    res = await client.chat.completions.create(
+                        model=MODEL,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    text = res.choices[0].message.content
+                    break
+                except RETRYABLE_ERRORS as e:
+                    error = e
+                    if attempt < retries:
+                        await asyncio.sleep(backoff_delay(attempt))
+                except openai.APIError as e:
+                    error = e
+                    break
+
+        if text:
+            await asyncio.to_thread(cache.put, MODEL, prompt, text)
+            stats["done"] += 1
+            done_rows.add(row)
+            record = {"key": key, "row": row, "kind": kind, "status": "done"}
+        else:
+            stats["failed"] += 1
+            failed_rows.add(row)
+            record = {"key": key, "row": row, "kind": kind, "status": "failed", "error": str(error)}
+        checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+        checkpoint.flush()
+        if on_progress:
+            on_progress(stats)
+
+    try:
+        await asyncio.gather(*(run_one(*job) for job in jobs))
+    finally:
+        checkpoint.close()
+    # 처리량 계산용: 이번 실행에서 모든 작업이 성공한 임원 수
+    stats["leaders"] = len(done_rows - failed_rows)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전체 임원 AI 요약/심층 분석 사전 생성")
+    parser.add_argument("files", nargs="+", help="리더십 진단 결과 파일 (xlsx/csv, 연도별 여러 개 가능)")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="생성 종류 (summary,analysis)")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--rpm", type=float, default=120, help="분당 최대 요청 수")
+    parser.add_argument("--retries", type=int, default=4, help="요청당 재시도 횟수")
+    parser.add_argument("--timeout", type=float, default=120, help="요청 타임아웃(초)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="완료/실패 기록(JSONL) 경로")
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"), help="OpenAI 호환 서버 주소")
+    parser.add_argument("--limit", type=int, help="앞에서부터 N명만 처리")
+    args = parser.parse_args(argv)
+
+    kinds = [k for k in args.kinds.split(",") if k in KINDS]
+    api_key = load_api_key()
+    if not api_key and not args.base_url:
+        print("API Key가 필요합니다. (OPENAI_API_KEY 또는 .streamlit/secrets.toml 의 JYL)", file=sys.stderr)
+        return 1
+
+    files = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            files.append((os.path.basename(path), f.read()))
+    dataset = get_dataset(files)
+
+    os.makedirs(os.path.dirname(args.checkpoint) or ".", exist_ok=True)
+    jobs, skipped = plan_jobs(dataset, kinds, args.limit)
+    leaders = len({row for row, _, _ in jobs})
+    failures = load_failures(args.checkpoint)
+    retried = sum(cache_key(MODEL, prompt) in failures for _, _, prompt in jobs)
+    print(f"임원 {len(dataset.leaders):,}명 · 생성 대상 {len(jobs):,}건 ({leaders:,}명, 이전 실패 재시도 {retried:,}건) · "
+          f"기존 결과 {skipped:,}건 건너뜀")
+    if not jobs:
+        return 0
+
+    # 캐시 최대 건수를 넘기면 LRU 정리로 이번에 만든 결과(또는 건너뛴 기존 결과)가 지워지므로 요청 전에 중단
+    cache = get_cache()
+    entries = cache.stats()["entries"]
+    if entries + len(jobs) > cache.max_entries:
+        print(f"결과 캐시 용량 부족: 기존 {entries:,}건 + 생성 {len(jobs):,}건 > 최대 {cache.max_entries:,}건. "
+              f"COACH_LLM_CACHE_MAX_ENTRIES를 {entries + len(jobs):,} 이상으로 늘려 다시 실행하세요.", file=sys.stderr)
+        return 1
+
+    client = openai.AsyncOpenAI(api_key=api_key or "stub", base_url=args.base_url, timeout=args.timeout, max_retries=0)
+    started = time.perf_counter()
+
+    def on_progress(stats):
+        finished = stats["done"] + stats["failed"]
+        if finished % 10 == 0 or finished == len(jobs):
+            elapsed = time.perf_counter() - started
+            print(f"  {finished:,}/{len(jobs):,} 완료 (실패 {stats['failed']:,}) · {elapsed:.1f}초", flush=True)
+
+    async def run():
+        try:
+            return await run_jobs(jobs, client, args.concurrency, args.rpm, args.retries, args.checkpoint, on_progress)
+        finally:
+            await client.close()
+
+    stats = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    print(f"완료 {stats['done']:,}건 · 실패 {stats['failed']:,}건 · {elapsed:.1f}초 · "
+          f"처리량 {stats['leaders'] / elapsed * 60:.1f} leaders/min")
+    return 0 if not stats["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+AppTest로 app.py를 실행하기 위한 진입 스크립트입니다.
+AppTest는 파일 업로드를 흉내 낼 수 없으므로, st.file_uploader를 BENCH_FILES(쉼표 구분 경로)의 파일을 돌려주도록 바꾼 뒤 app.py를 실행합니다.
+"""
+import io
+import os
+import runpy
+import sys
+
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class _UploadedFile(io.BytesIO):
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.file_id = path
+
+
+def _file_uploader(*args, accept_multiple_files=False, **kwargs):
+    files = [_UploadedFile(p) for p in os.environ["BENCH_FILES"].split(",")]
+    return files if accept_multiple_files else files[0]
+
+
+st.file_uploader = _file_uploader
+runpy.run_path(os.path.join(ROOT, "app.py"), run_name="__main__")
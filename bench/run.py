@@ -0,0 +1,265 @@
+"""
+성능 회귀 확인용 벤치마크입니다.
+가상 진단 파일(bench.workbook)과 가짜 LLM 서버(bench.stub_llm)로 아래 단계를 반복 측정하고 결과를 JSON으로 남깁니다.
+- load_data: 원본 파싱(cold) / 컬럼형 캐시(columnar) / 파싱 결과 보관본(history) / 공유 데이터셋 적중(shared)
+- parse_columns, 점수 계산(전체 테이블, 임원별 조회), 프롬프트 구성(임원당)
+- 앱 전체 실행(AppTest): 첫 실행, 같은 화면 재실행, 임원 전환, AI 요약 버튼(가짜 LLM 지연 포함)
+
+사용 예:
+    python -m bench.run --leaders 200 2000 --repeat 5
+    python -m bench.run --leaders 2000 --latency 1.0 --baseline bench/results/이전결과.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench.stub_llm import start_stub
+from bench.workbook import generate_workbook, write_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+SAMPLE_LEADERS = 50  # 임원 단위 측정에 쓰는 표본 수
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, repeat, setup=None):
+    # setup은 측정에서 제외하고 fn 실행 시간만 repeat번 잼
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def summarize(name, leaders, times, per=1, unit="call"):
+    times = [t / per for t in times]
+    return {
+        "name": name, "leaders": leaders, "unit": unit, "repeat": len(times),
+        "min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times), "max": max(times),
+    }
+
+
+def bench_pipeline(path, leaders, repeat):
+    # 저장소 모듈은 환경 변수(캐시 경로, LLM 주소) 설정 이후에 불러와야 함
+    from dataset import get_dataset, invalidate
+    from history import HISTORY_DIR
+    from ingest import CACHE_DIR, load_workbook
+    from prompts import leader_prompts
+    from scoring import compute_score_tables, leader_scores, strongest_weakest
+    from store import build_store
+    from survey import COMPETENCY_GROUPS, parse_columns
+
+    with open(path, "rb") as f:
+        files = [(os.path.basename(path), f.read())]
+    results = []
+
+    def cold():
+        invalidate()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        shutil.rmtree(HISTORY_DIR, ignore_errors=True)
+
+    def columnar():
+        invalidate()
+        shutil.rmtree(HISTORY_DIR, ignore_errors=True)
+
+    results.append(summarize("load_data.cold", leaders, measure(lambda: get_dataset(files), repeat, setup=cold)))
+    results.append(summarize("load_data.columnar", leaders, measure(lambda: get_dataset(files), repeat, setup=columnar)))
+    results.append(summarize("load_data.history", leaders, measure(lambda: get_dataset(files), repeat, setup=invalidate)))
+    results.append(summarize("load_data.shared", leaders, measure(lambda: get_dataset(files), repeat)))
+
+    df = load_workbook(*files[0])
+    columns = parse_columns(df)
+    store = build_store(df, columns)
+    results.append(summarize("parse_columns", leaders, measure(lambda: parse_columns(df), repeat)))
+    results.append(summarize(
+        "scoring.tables", leaders, measure(lambda: compute_score_tables(store.scores, len(df), COMPETENCY_GROUPS), repeat)
+    ))
+
+    dataset = get_dataset(files)
+    rows = np.unique(np.linspace(0, leaders - 1, min(leaders, SAMPLE_LEADERS)).astype(int))
+    latest_year = dataset.years[-1]
+
+    def score_rows():
+        for row in rows:
+            detailed, _, _ = leader_scores(dataset.cohort, row)
+            strongest_weakest(detailed[latest_year])
+
+    def prompt_rows():
+        for row in rows:
+            leader_prompts(dataset, row)
+
+    results.append(summarize("scoring.leader", leaders, measure(score_rows, repeat), per=len(rows), unit="leader"))
+    results.append(summarize("prompts.leader", leaders, measure(prompt_rows, repeat), per=len(rows), unit="leader"))
+    return results
+
+
+def bench_app(path, leaders, repeat, timeout):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from dataset import invalidate
+
+    os.environ["BENCH_FILES"] = path
+    results = []
+
+    def new_app():
+        at = AppTest.from_file(os.path.join(ROOT, "bench", "app_runner.py"), default_timeout=timeout)
+        at.secrets["JYL"] = "bench"
+        return at
+
+    def run(at):
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"앱 실행 오류: {at.exception[0].value}")
+
+    # 첫 실행: 공유 데이터셋/화면 캐시를 비운 새 세션 (컬럼형 파일 캐시는 유지)
+    apps = []
+
+    def cold():
+        invalidate()
+        st.cache_data.clear()
+        apps.append(new_app())
+
+    results.append(summarize("app.first_run", leaders, measure(lambda: run(apps[-1]), repeat, setup=cold)))
+    at = apps[-1]
+    results.append(summarize("app.rerun", leaders, measure(lambda: run(at), repeat)))
+
+    # 임원 전환 / AI 요약: 매번 처음 보는 임원으로 (화면 캐시·결과 캐시 미적중)
+    options = iter(range(1, len(at.selectbox[0].options)))
+
+    def switch():
+        at.selectbox[0].select_index(next(options)).run()
+        if at.exception:
+            raise RuntimeError(f"앱 실행 오류: {at.exception[0].value}")
+
+    results.append(summarize("app.switch_leader", leaders, measure(switch, repeat)))
+
+    def find_summary_button():
+        for _ in range(10):
+            switch()
+            buttons = [b for b in at.button if "요약" in b.label]
+            if buttons:
+                buttons[0].click()
+                return
+        raise RuntimeError("요약 버튼이 있는 임원을 찾지 못했습니다. (주관식 응답 비율 확인)")
+
+    results.append(summarize("app.ai_summary", leaders, measure(lambda: run(at), repeat, setup=find_summary_button)))
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["leaders"]): r for r in json.load(f)["results"]}
+    print(f"\n기준 결과 대비 ({baseline_path}, 중앙값)")
+    for r in results:
+        base = baseline.get((r["name"], r["leaders"]))
+        if base:
+            change = r["median"] / base["median"] - 1 if base["median"] else 0.0
+            print(f"  {r['name']:<20} {r['leaders']:>7,}명  {base['median'] * 1000:10.2f} → {r['median'] * 1000:10.2f} ms  {change:+7.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="리더십 코칭 앱 성능 벤치마크")
+    parser.add_argument("--leaders", type=int, nargs="+", default=[200, 2000], help="임원 수 (여러 개 가능)")
+    parser.add_argument("--years", type=int, default=3, help="연도 수")
+    parser.add_argument("--raters", type=int, default=2, help="연도/항목별 구성원 주관식 컬럼 수")
+    parser.add_argument("--response-rate", type=float, default=0.8, help="주관식 응답 비율")
+    parser.add_argument("--comment-sentences", type=int, default=2, help="코멘트당 평균 문장 수")
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx", help="가상 진단 파일 형식")
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 LLM 첫 토큰 지연(초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="가짜 LLM 스트리밍 조각 사이 지연(초)")
+    parser.add_argument("--skip-app", action="store_true", help="AppTest 앱 실행 측정 생략")
+    parser.add_argument("--timeout", type=float, default=600, help="AppTest 실행당 제한 시간(초)")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/<시각>_<커밋>.json)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    # 캐시(파일/LLM 결과/계측)는 실행마다 새 임시 폴더에 두어 이전 실행의 영향을 받지 않게 함
+    work_dir = tempfile.mkdtemp(prefix="coach-bench-")
+    server, base_url = start_stub(latency=args.latency, chunk_delay=args.chunk_delay)
+    os.environ.update({
+        "COACH_CACHE_DIR": os.path.join(work_dir, "workbooks"),
+        "COACH_HISTORY_DIR": os.path.join(work_dir, "partitions"),
+        "COACH_LLM_CACHE": os.path.join(work_dir, "llm_cache.sqlite3"),
+        "COACH_TELEMETRY_PATH": os.path.join(work_dir, "telemetry.jsonl"),
+        "COACH_TELEMETRY_METRICS": os.path.join(work_dir, "telemetry.prom"),
+        "OPENAI_BASE_URL": base_url,
+    })
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    import pandas as pd
+    import streamlit
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    report = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": {"pandas": pd.__version__, "numpy": np.__version__, "streamlit": streamlit.__version__},
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "workbooks": [],
+        "results": [],
+    }
+    try:
+        for leaders in args.leaders:
+            started = time.perf_counter()
+            df = generate_workbook(
+                leaders, years=args.years, raters_per_year=args.raters,
+                response_rate=args.response_rate, sentences=args.comment_sentences,
+            )
+            path = write_workbook(df, os.path.join(work_dir, f"bench_{leaders}.{args.format}"))
+            report["workbooks"].append({
+                "leaders": leaders, "columns": len(df.columns), "bytes": os.path.getsize(path),
+                "generate_seconds": time.perf_counter() - started,
+            })
+            print(f"[{leaders:,}명] 가상 진단 파일 {os.path.getsize(path) / 2**20:.1f} MB · 컬럼 {len(df.columns):,}개", flush=True)
+
+            results = bench_pipeline(path, leaders, args.repeat)
+            if not args.skip_app:
+                results += bench_app(path, leaders, args.repeat, args.timeout)
+            for r in results:
+                print(f"  {r['name']:<20} 중앙값 {r['median'] * 1000:10.2f} ms/{r['unit']}  (최소 {r['min'] * 1000:.2f}, 최대 {r['max'] * 1000:.2f})", flush=True)
+            report["results"] += results
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["llm_requests"] = server.requests
+    report["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {out}")
+
+    if args.baseline:
+        compare(report["results"], args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+벤치마크용 OpenAI 호환 가짜 LLM 서버입니다. (/v1/chat/completions, 스트리밍/비스트리밍)
+실제 API 대신 지연시간(첫 토큰까지 latency, 조각 사이 chunk_delay)을 흉내 내 네트워크 대기를 재현합니다.
+
+사용 예:
+    python -m bench.stub_llm --port 8765 --latency 0.8
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE_TEXT = (
+    "1. 주요 강점: 구성원과의 소통과 신뢰 형성이 꾸준히 언급됩니다.\n"
+    "2. 주요 보완점: 권한 위임과 피드백의 구체성이 아쉽다는 의견이 있습니다.\n"
+    "3. 종합 제언: 강점인 소통을 바탕으로 육성 중심의 피드백을 늘려 보시길 권합니다."
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_chunk(self, payload):
+        data = f"data: {payload}\n\n".encode()
+        self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+        prompt_tokens = sum(len(m.get("content") or "") for m in body.get("messages", [])) // 2
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": server.chunks, "total_tokens": prompt_tokens + server.chunks}
+        time.sleep(server.latency)
+
+        base = {"id": "bench", "created": 0, "model": body.get("model", "bench")}
+        if not body.get("stream"):
+            data = json.dumps({
+                **base, "object": "chat.completion", "usage": usage,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": RESPONSE_TEXT}, "finish_reason": "stop"}],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = -(-len(RESPONSE_TEXT) // server.chunks)
+        for i in range(0, len(RESPONSE_TEXT), size):
+            self._send_chunk(json.dumps({
+                **base, "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": RESPONSE_TEXT[i:i + size]}, "finish_reason": None}],
+            }))
+            time.sleep(server.chunk_delay)
+        if body.get("stream_options", {}).get("include_usage"):
+            self._send_chunk(json.dumps({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}))
+        self._send_chunk("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def start_stub(port=0, latency=0.5, chunk_delay=0.02, chunks=20):
+    """
+    백그라운드 스레드에서 가짜 서버를 띄우고 (server, base_url)을 반환합니다. (port=0이면 빈 포트 자동 선택)
+    server.requests로 받은 요청 수를 볼 수 있고, server.shutdown()으로 종료합니다.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.latency, server.chunk_delay, server.chunks = latency, chunk_delay, chunks
+    server.requests, server.lock = 0, threading.Lock()
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 OpenAI 호환 가짜 LLM 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="첫 토큰까지 지연(초)")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="스트리밍 조각 사이 지연(초)")
+    parser.add_argument("--chunks", type=int, default=20, help="응답을 나눠 보낼 조각 수")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_stub(args.port, args.latency, args.chunk_delay, args.chunks)
+    print(f"가짜 LLM 서버 실행 중: OPENAI_BASE_URL={base_url} (Ctrl+C로 종료)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
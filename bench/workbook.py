@@ -0,0 +1,141 @@
+"""
+벤치마크용 가상 리더십 진단 파일(xlsx/csv)을 만듭니다.
+컬럼명은 실제 파일과 같은 규칙(점수/주관식 `항목_NN년`, 동료 응답 `항목_동료_NN년`)을 따르고,
+주관식은 실제 코멘트처럼 주제/표현을 조합한 한국어 문장(비슷한 표현 반복 포함)으로 채웁니다.
+
+사용 예:
+    python -m bench.workbook bench_2000.xlsx --leaders 2000 --years 3
+    python -m bench.workbook bench_10k.csv --leaders 10000 --years 10 --comment-sentences 3
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from survey import COMPETENCY_GROUPS
+
+# --- 주관식 문장 재료 ---
+TOPICS = [
+    "소통", "의사결정", "구성원 육성", "비전 공유", "실행력", "협업", "피드백", "권한 위임", "변화 추진", "전략적 사고",
+    "현장 이해", "목표 설정", "동기 부여", "신뢰 형성", "경청", "위기 대응", "성과 관리", "솔선수범", "조직 문화", "SUPEX 추구",
+]
+SITUATIONS = [
+    "", "", "회의 때 ", "어려운 상황에서도 ", "바쁜 와중에도 ", "구성원 의견을 경청하며 ", "평소 ", "프로젝트 진행 시 ", "부서 간 업무에서 ",
+]
+STRENGTHS = [
+    "{topic}{이가} 뛰어나십니다.", "{topic}{이가} 뛰어남", "{topic}에 강점이 있음.", "{topic}{을를} 항상 중시하십니다.",
+    "{topic} 측면에서 모범이 됩니다.", "{topic}{이가} 탁월하심", "{topic}{을를} 잘 해주셔서 감사합니다.", "{topic}{이가} 좋음",
+]
+IMPROVEMENTS = [
+    "{topic}{이가} 다소 부족함", "{topic} 측면에서 보완이 필요합니다.", "{topic}에 좀 더 신경 써 주시면 좋겠습니다.",
+    "{topic}{이가} 아쉽습니다.", "{topic}{을를} 더 강화해 주셨으면 합니다.", "{topic}에 대한 고민이 더 필요해 보임",
+]
+EMPTY_RESPONSES = ["-", "없음", "0", "특별히 없습니다."]
+TEXT_ITEMS = [("강점", STRENGTHS), ("보완점", IMPROVEMENTS)]
+DIVISIONS = ["경영지원부문", "전략부문", "영업부문", "생산부문", "R&D부문", "글로벌부문", "IT부문"]
+TITLES = ["상무", "전무", "부사장"]
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = "민서준영지현우진수호성연하은재윤동승혁태희경"
+
+
+def _particle(word, pair):
+    # 받침 유무에 따라 조사 선택 (pair: "이가"/"을를")
+    last = word[-1]
+    has_batchim = "가" <= last <= "힣" and (ord(last) - 0xAC00) % 28 != 0
+    return pair[0] if has_batchim else pair[1]
+
+
+def _sentence(rng, templates):
+    topic = TOPICS[rng.integers(len(TOPICS))]
+    template = templates[rng.integers(len(templates))]
+    situation = SITUATIONS[rng.integers(len(SITUATIONS))]
+    return situation + template.format(topic=topic, 이가=_particle(topic, "이가"), 을를=_particle(topic, "을를"))
+
+
+def _comments(rng, n, templates, response_rate, sentences):
+    # 응답하지 않은 칸은 NaN, 일부는 "-"/"없음" 같은 빈 응답, 나머지는 1~(2×sentences-1)개 문장
+    values = np.full(n, np.nan, dtype=object)
+    answered = np.flatnonzero(rng.random(n) < response_rate)
+    for i in answered:
+        if rng.random() < 0.08:
+            values[i] = EMPTY_RESPONSES[rng.integers(len(EMPTY_RESPONSES))]
+            continue
+        count = int(rng.integers(1, 2 * sentences)) if sentences > 1 else 1
+        values[i] = " ".join(_sentence(rng, templates) for _ in range(count))
+    return values
+
+
+def generate_workbook(leaders, years=3, last_year=24, groups=COMPETENCY_GROUPS, raters_per_year=2,
+                      response_rate=0.8, sentences=2, peer=True, seed=0):
+    """
+    가상 진단 결과 프레임을 만듭니다.
+    - years: 최근 연도 수 (last_year부터 거꾸로, 예: 3 → 22년/23년/24년)
+    - groups: 역량 그룹 → 세부 역량 목록 (기본은 survey.COMPETENCY_GROUPS)
+    - raters_per_year: 연도/항목(강점·보완점)별 구성원 주관식 컬럼 수 (동료는 1개)
+    - response_rate / sentences: 주관식 응답 비율과 코멘트당 평균 문장 수
+    """
+    rng = np.random.default_rng(seed)
+    year_labels = [f"{y % 100:02d}년" for y in range(last_year - years + 1, last_year + 1)]
+    competencies = [c for items in groups.values() for c in items]
+
+    data = {
+        "사번": [f"E{i:06d}" for i in range(leaders)],
+        "이름": [SURNAMES[rng.integers(len(SURNAMES))] + GIVEN[rng.integers(len(GIVEN))] + GIVEN[rng.integers(len(GIVEN))] for _ in range(leaders)],
+        "부문": rng.choice(DIVISIONS, leaders),
+        "직급": rng.choice(TITLES, leaders, p=[0.6, 0.3, 0.1]),
+    }
+    # 임원별 기본 수준 + 역량별 편차 + 연도별 변화 (1~5점, 일부 무응답)
+    ability = rng.normal(4.0, 0.3, leaders)
+    bias = rng.normal(0, 0.25, (leaders, len(competencies)))
+    for t, year in enumerate(year_labels):
+        drift = rng.normal(0, 0.15, leaders) * t
+        member = np.clip(ability[:, None] + bias + drift[:, None] + rng.normal(0, 0.2, (leaders, len(competencies))), 1, 5)
+        member[rng.random(member.shape) < 0.01] = np.nan
+        for i, comp in enumerate(competencies):
+            data[f"{comp}_{year}"] = np.round(member[:, i], 2)
+        for item, templates in TEXT_ITEMS:
+            for k in range(raters_per_year):
+                suffix = f"{item}{k + 1}" if raters_per_year > 1 else item
+                data[f"{suffix}_{year}"] = _comments(rng, leaders, templates, response_rate, sentences)
+        if peer:
+            peer_scores = np.clip(member + rng.normal(0, 0.3, member.shape), 1, 5)
+            for i, comp in enumerate(competencies):
+                data[f"{comp}_동료_{year}"] = np.round(peer_scores[:, i], 2)
+            for item, templates in TEXT_ITEMS:
+                data[f"{item}_동료_{year}"] = _comments(rng, leaders, templates, response_rate * 0.7, sentences)
+    return pd.DataFrame(data)
+
+
+def write_workbook(df, path):
+    if path.endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 가상 리더십 진단 파일 생성")
+    parser.add_argument("path", help="출력 파일 (.xlsx 또는 .csv)")
+    parser.add_argument("--leaders", type=int, default=500, help="임원 수")
+    parser.add_argument("--years", type=int, default=3, help="연도 수")
+    parser.add_argument("--last-year", type=int, default=24, help="마지막 연도 (두 자리)")
+    parser.add_argument("--raters", type=int, default=2, help="연도/항목별 구성원 주관식 컬럼 수")
+    parser.add_argument("--response-rate", type=float, default=0.8, help="주관식 응답 비율")
+    parser.add_argument("--comment-sentences", type=int, default=2, help="코멘트당 평균 문장 수")
+    parser.add_argument("--no-peer", action="store_true", help="동료 응답 컬럼 제외")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    df = generate_workbook(
+        args.leaders, years=args.years, last_year=args.last_year, raters_per_year=args.raters,
+        response_rate=args.response_rate, sentences=args.comment_sentences, peer=not args.no_peer, seed=args.seed,
+    )
+    write_workbook(df, args.path)
+    print(f"{args.path}: 임원 {len(df):,}명 · 컬럼 {len(df.columns):,}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
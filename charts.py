@@ -0,0 +1,55 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from survey import COMPETENCY_GROUPS
+
+RADAR_COLORS = ['#cbd5e1', '#94a3b8', '#2563eb']
+COHORT_COLOR = '#94a3b8'
+
+
+def trend_figure(sorted_years, avg_scores, standing=None):
+    # 리더십 종합 점수 추이 (라인 차트)
+    trend_df = pd.DataFrame({"Year": sorted_years, "Score": [avg_scores[y] for y in sorted_years]})
+    fig_line = px.line(trend_df, x="Year", y="Score", markers=True, range_y=[0, 5.5], text="Score")
+    fig_line.update_traces(line_color='#2563eb', line_width=3, textposition="top center", texttemplate='%{text:.2f}')
+    if standing is not None:
+        # 비교 집단의 중간 50%(1~3사분위) 구간과 중앙값을 뒤에 깔고, 임원 점수에는 백분위를 표시
+        cohort = standing.loc["overall"].droplevel(1).reindex(sorted_years)
+        group = standing["group"].iloc[0]
+        fig_line.data[0].update(
+            name="본인", showlegend=True, customdata=cohort["percentile"],
+            hovertemplate="%{x}: %{y:.2f} (백분위 %{customdata:.0f})<extra></extra>",
+        )
+        leader_trace = fig_line.data[0]
+        fig_line.data = []
+        fig_line.add_trace(go.Scatter(x=sorted_years, y=cohort["q3"], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig_line.add_trace(go.Scatter(
+            x=sorted_years, y=cohort["q1"], mode="lines", line=dict(width=0), fill="tonexty",
+            fillcolor="rgba(148, 163, 184, 0.2)", name=f"{group} 중간 50%", hoverinfo="skip",
+        ))
+        fig_line.add_trace(go.Scatter(
+            x=sorted_years, y=cohort["median"], mode="lines", line=dict(color=COHORT_COLOR, dash="dash"),
+            name=f"{group} 중앙값", hovertemplate="%{x}: %{y:.2f}<extra></extra>",
+        ))
+        fig_line.add_trace(leader_trace)
+    return fig_line
+
+
+def radar_figure(sorted_years, grouped_scores, latest_year, standing=None):
+    # 리더십 영역(역량 그룹)별 변화 (레이더 차트)
+    fig_radar = go.Figure()
+    cats = list(COMPETENCY_GROUPS.keys())
+    for i, year in enumerate(sorted_years):
+        vals = [grouped_scores[year].get(cat, 0) for cat in cats]
+        vals += [vals[0]]
+        fig_radar.add_trace(go.Scatterpolar(r=vals, theta=cats+[cats[0]], fill='toself' if year==latest_year else 'none', name=year, line_color=RADAR_COLORS[i] if i<3 else 'black'))
+    if standing is not None:
+        # 최근 연도 비교 집단 중앙값
+        medians = standing.loc[("grouped", latest_year), "median"].reindex(cats).fillna(0).tolist()
+        fig_radar.add_trace(go.Scatterpolar(
+            r=medians + [medians[0]], theta=cats+[cats[0]], fill='none', name=f"{standing['group'].iloc[0]} 중앙값 ({latest_year})",
+            line=dict(color=COHORT_COLOR, dash='dash'),
+        ))
+    fig_radar.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 5])), showlegend=True, margin=dict(t=20, b=20, l=20, r=20))
+    return fig_radar
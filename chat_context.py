@@ -0,0 +1,112 @@
+import os
+from textwrap import dedent
+
+# --- 코칭 대화 컨텍스트 설정 ---
+# 한 턴에 보내는 입력 토큰 상한. 넘치는 오래된 대화는 누적 요약(rolling summary)으로 압축합니다.
+CHAT_TOKEN_BUDGET = int(os.environ.get("COACH_CHAT_TOKEN_BUDGET", "8000"))
+LEADER_CONTEXT_SHARE = 0.35  # 예산 중 임원 데이터(점수/주관식 분석)에 쓰는 최대 비율
+KEEP_RECENT = 4  # 요약하지 않고 항상 원문으로 보내는 최근 메시지 수
+MESSAGE_OVERHEAD = 4  # 메시지당 role/구분자 토큰
+
+COACH_GUIDE = dedent("""
+    당신은 임원 전용 리더십 코치입니다.
+
+    [가이드]
+    1. **전문가 페르소나:** 깊이 있는 통찰 제공.
+    2. **사내 철학 연계:** 질문에 답변할 때 필요하다면 [SKMS 및 사내 고유 철학 핵심 요약]의 내용(VWBE, SUPEX, 구성원 행복 등)을 자연스럽게 인용하여 조언하세요.
+    3. **추가 제안:** 필요 시 이론/영상/워크숍 추천.
+    4. **Next Step:** 답변 끝에 항상 코칭 질문(GROW 등)을 던져 대화를 이어나갈 것. (문구: 해당 질문에 답을 해주시면 다음 단계로 이어나가 보겠습니다)
+    """)
+
+
+def estimate_tokens(text):
+    """
+    토크나이저 없이 쓰는 빠른 토큰 수 추정치입니다. (영문/숫자 약 4자당 1토큰, 한글 등은 1.5자당 1토큰)
+    """
+    if not text:
+        return 0
+    chars = len(text)
+    # UTF-8에서 한글은 3바이트이므로 바이트 수 차이로 비ASCII 문자 수를 근사
+    non_ascii = min(chars, (len(text.encode("utf-8")) - chars) // 2)
+    return int((chars - non_ascii) / 4 + non_ascii / 1.5) + 1
+
+
+def message_tokens(messages):
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+def truncate_to_tokens(text, max_tokens):
+    # 추정 토큰 수가 상한을 넘으면 비율만큼 앞부분만 남김
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    return text[:int(len(text) * max_tokens / tokens)] + " …(이하 생략)"
+
+
+def build_system_prefix(knowledge_base):
+    """
+    임원/대화와 무관하게 항상 같은 시스템 메시지입니다.
+    매 요청의 맨 앞에 두어 서버 측 프롬프트 캐시(prefix caching)에 적중하도록 합니다.
+    """
+    return COACH_GUIDE + knowledge_base
+
+
+def build_leader_context(leader_name, avg_scores, top_comp, bot_comp, qual_context, budget=CHAT_TOKEN_BUDGET):
+    context = dedent(f"""
+        [코칭 대상] {leader_name}
+        [데이터] 점수: {avg_scores}, 강점: {top_comp}, 약점: {bot_comp}
+        [주관식 분석] {qual_context}
+        """)
+    return truncate_to_tokens(context, int(budget * LEADER_CONTEXT_SHARE))
+
+
+def build_messages(system_prefix, leader_context, summary, history, budget=CHAT_TOKEN_BUDGET):
+    """
+    [고정 시스템 메시지] → [임원 데이터] → [이전 대화 요약] → [최근 대화] 순서로 요청 메시지를 만듭니다.
+    최근 대화는 예산 안에 들어가는 만큼만 최신 순으로 담습니다.
+    """
+    head = [
+        {"role": "system", "content": system_prefix},
+        {"role": "system", "content": leader_context},
+    ]
+    if summary:
+        head.append({"role": "system", "content": f"[이전 대화 요약]\n{summary}"})
+
+    remaining = budget - message_tokens(head)
+    recent = []
+    for msg in reversed(history):
+        cost = estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD
+        if recent and cost > remaining:
+            break
+        recent.append(msg)
+        remaining -= cost
+    return head + recent[::-1]
+
+
+def build_summary_request(summary, turns):
+    transcript = "\n".join(f"[{m['role']}] {m['content']}" for m in turns)
+    return [{"role": "user", "content": dedent("""
+        다음은 임원 리더십 코칭 대화의 기존 요약과 그 이후 대화입니다.
+        임원이 말한 고민/상황, 코치가 제안한 내용, 합의한 다음 단계를 중심으로 하나의 요약으로 갱신해주세요.
+        (한국어, 10줄 이내, 불릿 형식)
+
+        [기존 요약]
+        """) + (summary or "없음") + "\n\n[이후 대화]\n" + transcript}]
+
+
+def compact_history(messages, summary, summarized, summarize, budget=CHAT_TOKEN_BUDGET):
+    """
+    요약되지 않은 대화(messages[summarized:])가 대화용 예산을 넘으면, 오래된 메시지를 기존 요약에 합칩니다.
+    한 번에 예산의 절반까지 줄여 두므로 요약 호출은 여러 턴에 한 번만 일어납니다.
+    summarize(summary, turns)는 갱신된 요약 텍스트를 반환해야 하며, (summary, summarized)를 반환합니다.
+    """
+    history_budget = int(budget * (1 - LEADER_CONTEXT_SHARE)) // 2
+    pending = messages[summarized:]
+    if message_tokens(pending) <= history_budget or len(pending) <= KEEP_RECENT:
+        return summary, summarized
+
+    fold, remaining = 0, message_tokens(pending)
+    while len(pending) - fold > KEEP_RECENT and remaining > history_budget // 2:
+        remaining -= estimate_tokens(pending[fold]["content"]) + MESSAGE_OVERHEAD
+        fold += 1
+    return summarize(summary, pending[:fold]), summarized + fold
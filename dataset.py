@@ -0,0 +1,293 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import history
+from dedup import assign_clusters
+from ingest import file_digest, load_workbook
+from keywords import build_keyword_index, merge_keyword_indexes
+from leader_index import build_leader_index
+from percentiles import build_cohort_index
+from scoring import compute_score_tables
+from store import build_store, merge_stores
+from survey import COMPETENCY_GROUPS, find_id_column, find_name_column, parse_columns
+from telemetry import span
+
+# --- 공유 데이터셋 보관 한도 (오래 안 쓴 것부터 비움) ---
+MAX_PARTITIONS = int(os.environ.get("COACH_MAX_PARTITIONS", "32"))  # 파싱해 둔 파일 수
+MAX_DATASETS = int(os.environ.get("COACH_MAX_DATASETS", "8"))  # 합쳐 둔 파일 조합 수
+
+
+@dataclass(frozen=True)
+class Partition:
+    """
+    업로드 파일 한 개(연도별/평가자별 파일 등)를 파싱한 결과입니다.
+    파일 내용 해시 기준으로 한 번만 만들어지고, 새 파일이 추가되어도 다시 파싱하지 않습니다.
+    디스크(history)에도 보관하므로 앱을 다시 시작해도 원본 없이 불러올 수 있습니다.
+    """
+    file_hash: str
+    name: str
+    meta: pd.DataFrame
+    columns: tuple
+    store: object  # store.SurveyStore (점수는 여기에만 둠, comments에는 유사 코멘트 묶음 포함)
+    keywords: object  # keywords.KeywordIndex (이 파일의 주관식 키워드 빈도)
+    name_keys: pd.Index
+    id_keys: object  # 사번 컬럼이 없으면 None
+    row_hashes: np.ndarray  # 행(임원)별 내용 해시
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    프로세스 전체가 공유하는 읽기 전용 데이터셋입니다.
+    세션마다 DataFrame을 복사하지 않고, 같은 파일 조합(내용 해시)이면 동일한 객체를 참조합니다.
+    점수/주관식은 long-format 저장소(store)에 두고, 넓은 원본 프레임은 메타 컬럼만 남깁니다.
+    임원별 세부/그룹/종합 점수는 저장소에서 계산한 분포 색인(cohort)에서 읽습니다.
+    """
+    file_hash: str  # 파일 조합 전체의 해시
+    partitions: tuple  # 구성 파일 해시 (업로드 순서)
+    _frame: object  # 메타 컬럼(이름, 소속 등)만 남긴 프레임
+    columns: tuple  # parse_columns 결과 (meta, member, peer, member_text, peer_text)
+    store: object  # store.SurveyStore
+    keywords: object  # keywords.KeywordIndex (전체 임원 주관식 키워드 빈도)
+    cohort: object  # percentiles.CohortIndex (전체 임원 점수 테이블과 분포)
+    name_col: str
+    leaders: object  # leader_index.LeaderIndex
+    leader_versions: np.ndarray  # 임원별 데이터 버전 (해당 임원 데이터가 바뀔 때만 달라짐)
+
+    @property
+    def years(self):
+        return self.cohort.years
+
+    @property
+    def frame(self):
+        # 얕은 복사(Copy-on-Write)로 원본 데이터를 건드리지 않는 읽기 전용 뷰를 제공
+        return self._frame.copy(deep=False)
+
+    def row(self, pos):
+        return self._frame.iloc[pos]
+
+    def leader_version(self, pos):
+        return format(int(self.leader_versions[pos]), "016x")
+
+
+def _leader_keys(values):
+    # 동명이인은 파일 내 등장 순서로 구분 (예: 홍길동#0, 홍길동#1)
+    values = values.astype(str)
+    occurrence = values.groupby(values).cumcount().astype(str)
+    return pd.Index(values + "#" + occurrence)
+
+
+def build_partition(name, data):
+    with span("file_load", file=name, bytes=len(data)):
+        df = load_workbook(name, data)
+    with span("parse_columns"):
+        columns = parse_columns(df)
+    id_col = find_id_column(columns[0])
+    with span("store"):
+        store = build_store(df, columns)
+    # 유사 코멘트 묶음/키워드 빈도는 파일별로 한 번만 계산하고, 합칠 때는 이어 붙이기만 함
+    with span("dedup"):
+        store = assign_clusters(store)
+    with span("keyword_index"):
+        keywords = build_keyword_index(store)
+    return Partition(
+        file_hash=file_digest(data),
+        name=name,
+        meta=df[columns[0]],
+        columns=columns,
+        store=store,
+        keywords=keywords,
+        name_keys=_leader_keys(df[find_name_column(df)]),
+        id_keys=_leader_keys(df[id_col]) if id_col else None,
+        row_hashes=pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64),
+    )
+
+
+def _merge_columns(partitions):
+    meta_cols = list(dict.fromkeys(c for p in partitions for c in p.columns[0]))
+    merged = [meta_cols]
+    for i in range(1, 5):
+        col_map = {}
+        for p in partitions:
+            col_map.update(p.columns[i])
+        merged.append({year: col_map[year] for year in sorted(col_map)})
+    return tuple(merged)
+
+
+def merge_partitions(partitions):
+    """
+    여러 파일을 임원 기준(사번, 없으면 이름)으로 합쳐 하나의 데이터셋을 만듭니다.
+    파일별 파싱 결과(long-format 저장소, 유사 코멘트 묶음, 키워드 빈도)를 그대로 이어 붙이고, 점수 테이블은 합친 저장소에서 한 번 계산합니다.
+    """
+    use_id = all(p.id_keys is not None for p in partitions)
+    part_keys = [p.id_keys if use_id else p.name_keys for p in partitions]
+    all_keys = pd.Index(np.concatenate([k.to_numpy(dtype=object) for k in part_keys])).unique()
+    row_maps = [all_keys.get_indexer(k).astype(np.int32) for k in part_keys]
+    n = len(all_keys)
+
+    # 메타 정보는 최신 파일 값 우선
+    meta = pd.concat([p.meta.assign(_key=k.to_numpy()) for p, k in zip(partitions, part_keys)], ignore_index=True)
+    meta = meta.drop_duplicates("_key", keep="last").set_index("_key").reindex(all_keys).reset_index(drop=True)
+
+    versions = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for p, row_map in zip(partitions, row_maps):
+            versions[row_map] = versions[row_map] * np.uint64(1099511628211) + p.row_hashes
+
+    name_col = find_name_column(meta)
+    hashes = [p.file_hash for p in partitions]
+    with span("merge"):
+        store = merge_stores([(p.store, m) for p, m in zip(partitions, row_maps)])
+        keywords = merge_keyword_indexes(
+            [(p.keywords, p.store.comments, m) for p, m in zip(partitions, row_maps)],
+            list(store.comments["year"].cat.categories),
+        )
+    with span("scoring"):
+        scores = compute_score_tables(store.scores, n, COMPETENCY_GROUPS)
+    with span("cohort_index"):
+        cohort = build_cohort_index(scores, meta)
+    return Dataset(
+        file_hash=_combined_hash(hashes),
+        partitions=tuple(hashes),
+        _frame=meta,
+        columns=_merge_columns(partitions),
+        store=store,
+        keywords=keywords,
+        cohort=cohort,
+        name_col=name_col,
+        leaders=build_leader_index(meta, name_col, find_id_column(meta.columns)),
+        leader_versions=versions,
+    )
+
+
+def _combined_hash(hashes):
+    if len(hashes) == 1:
+        return hashes[0]
+    return hashlib.sha256("|".join(hashes).encode()).hexdigest()
+
+
+# --- 프로세스 단위 데이터셋 저장소 ---
+# 조회할 때마다 맨 뒤(최근)로 옮기고, 한도를 넘으면 맨 앞(가장 오래 안 쓴 것)부터 비움 (LRU)
+_lock = threading.Lock()
+_partitions = OrderedDict()  # 파일 해시 -> Partition
+_datasets = OrderedDict()  # 파일 조합 해시 -> Dataset
+
+
+def _lookup(table, key):
+    value = table.get(key)
+    if value is not None:
+        table.move_to_end(key)
+    return value
+
+
+def _store(table, key, value, limit):
+    value = table.setdefault(key, value)
+    table.move_to_end(key)
+    while len(table) > max(limit, 1):
+        table.popitem(last=False)
+    return value
+
+
+def get_stored_partition(file_hash):
+    """
+    이전에 파싱해 둔 파일을 원본 없이 불러옵니다. (메모리 → 디스크 보관본 순, 없으면 None)
+    """
+    with _lock:
+        partition = _lookup(_partitions, file_hash)
+        if partition is not None:
+            return partition
+
+    with span("history_load"):
+        partition = history.load(file_hash)
+    if not isinstance(partition, Partition):
+        return None
+    with _lock:
+        return _store(_partitions, file_hash, partition, MAX_PARTITIONS)
+
+
+def get_partition(name, data):
+    file_hash = file_digest(data)
+    partition = get_stored_partition(file_hash)
+    if partition is not None:
+        return partition
+
+    partition = build_partition(name, data)
+    with span("history_save"):
+        history.save(file_hash, partition, {
+            "name": name,
+            "years": list(partition.store.comments["year"].cat.categories),
+            "leaders": len(partition.meta),
+        })
+    with _lock:
+        return _store(_partitions, file_hash, partition, MAX_PARTITIONS)
+
+
+def stored_files():
+    """
+    디스크에 보관 중인 파일 목록 (file_hash, name, years, leaders, saved_at), 오래된 것부터
+    보관 폴더는 서버 전체가 함께 쓰므로 다른 세션(다른 코치)이 올린 파일도 포함됩니다.
+    """
+    return history.entries()
+
+
+def get_dataset(files, stored=()):
+    """
+    (파일명, 내용) 목록으로 공유 데이터셋을 반환합니다.
+    이미 본 파일은 다시 파싱하지 않고, 새로 추가된 파일(예: 올해 진단 결과)만 파싱해 합칩니다.
+    stored에는 보관 중인 파일 해시(stored_files)를 줄 수 있으며, 업로드 파일보다 오래된 것으로 보고 앞에 둡니다.
+    파일 내용 해시로 구분하므로 다른 세션이 같은 이름의 다른 파일을 올려도 서로 영향을 주지 않습니다.
+    """
+    uploaded = [get_partition(name, data) for name, data in files]
+    known = {p.file_hash for p in uploaded}
+    # 보관본이 그 사이 정리(LRU)되어 없으면 건너뜀
+    previous = [p for p in map(get_stored_partition, dict.fromkeys(stored)) if p is not None and p.file_hash not in known]
+    partitions = previous + uploaded
+    if not partitions:
+        raise ValueError("불러올 파일이 없습니다.")
+    dataset_hash = _combined_hash([p.file_hash for p in partitions])
+    with _lock:
+        dataset = _lookup(_datasets, dataset_hash)
+        if dataset is not None:
+            return dataset
+
+    dataset = merge_partitions(partitions)
+    with _lock:
+        return _store(_datasets, dataset_hash, dataset, MAX_DATASETS)
+
+
+def release(file_hashes):
+    """
+    한 세션이 더 이상 쓰지 않는 파일 버전(새 버전으로 바꾸거나 뺀 파일)과 이를 포함한 데이터셋을 가장 먼저 비울 대상으로 돌립니다.
+    바로 지우지 않으므로 같은 버전을 쓰는 다른 세션은 다음 조회 때 다시 최근으로 옮겨져 영향이 없습니다.
+    """
+    file_hashes = set(file_hashes)
+    with _lock:
+        for file_hash in file_hashes & _partitions.keys():
+            _partitions.move_to_end(file_hash, last=False)
+        for key in [k for k, d in _datasets.items() if file_hashes & set(d.partitions)]:
+            _datasets.move_to_end(key, last=False)
+
+
+def _invalidate(file_hash):
+    _partitions.pop(file_hash, None)
+    _datasets.pop(file_hash, None)
+    for key in [k for k, d in _datasets.items() if file_hash in d.partitions]:
+        del _datasets[key]
+
+
+def invalidate(file_hash=None):
+    """
+    공유 데이터셋을 바로 무효화합니다. (파일 또는 파일 조합 해시, 없으면 전체 초기화)
+    """
+    with _lock:
+        if file_hash is None:
+            _partitions.clear()
+            _datasets.clear()
+            return
+        _invalidate(file_hash)
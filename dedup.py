@@ -0,0 +1,165 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+# --- 유사 코멘트 묶기 설정 ---
+# 문자 2-gram MinHash + LSH로 같은 임원·같은 연도의 거의 같은 코멘트(예: "소통이 좋음" / "소통이 좋습니다")를 한 묶음으로 만듭니다.
+NUM_HASHES = 32
+BANDS = NUM_HASHES // 2  # LSH 밴드당 해시 2개 (31비트 값 2개를 하나의 uint64 키로 합침)
+SIMILARITY = 0.8  # 같은 묶음으로 볼 최소 Jaccard 유사도 (MinHash 추정치로 후보를 거르고, 대표와의 실제 값으로 확인)
+# 글자는 거의 같아도 뜻이 반대인 코멘트("관심이 많으심" / "관심이 부족함")를 가르는 평가 어간. 포함 여부가 다르면 묶지 않음
+TONE_STEMS = ("좋", "훌륭", "뛰어", "탁월", "우수", "잘", "많", "높", "부족", "아쉽", "아쉬", "미흡", "없", "않", "못", "낮")
+CHUNK_SHINGLES = 1_000_000  # MinHash 계산 시 한 번에 처리하는 shingle 수 (메모리 상한)
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, int(_PRIME), NUM_HASHES, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_HASHES, dtype=np.uint64)
+
+ENDING_PATTERN = r"(습니다|입니다|합니다|됩니다|였음|었음|했음|십니다|해요|세요|네요|어요|아요|음|함|임|다|요)(?=[^가-힣A-Za-z0-9]*$)"
+
+
+def normalize_comments(texts):
+    # 문장 끝 존댓말/명사형 어미와 공백·문장부호를 제거한 비교용 문자열
+    return (
+        texts.astype(str).str.strip()
+        .str.replace(ENDING_PATTERN, "", regex=True)
+        .str.replace(r"[^가-힣A-Za-z0-9]", "", regex=True)
+        .str.lower()
+    )
+
+
+def _bigrams(s):
+    # 문자 2-gram (1글자 이하는 문자열 전체를 하나의 shingle로)
+    return [s[i:i + 2] for i in range(len(s) - 1)] or [s]
+
+
+def _shingles(normalized):
+    grams = [_bigrams(s) for s in normalized]
+    lengths = np.fromiter((len(g) for g in grams), dtype=np.int64, count=len(grams))
+    codes, _ = pd.factorize(pd.Series([g for gs in grams for g in gs], dtype=object))
+    return codes, lengths
+
+
+def minhash_signatures(normalized):
+    """
+    코멘트별 MinHash 서명 (n × NUM_HASHES) 을 계산합니다.
+    정규화 결과가 같은 코멘트는 한 번만 계산하고, 해시는 고유 shingle별로 한 번만 구해 묶음 단위로 최솟값을 집계합니다.
+    """
+    text_codes, uniques = pd.factorize(normalized)
+    codes, lengths = _shingles(uniques)
+    table = (np.arange(codes.max() + 1 if len(codes) else 0, dtype=np.uint64)[:, None] * _A + _B) % _PRIME
+    n = len(lengths)
+    signatures = np.empty((n, NUM_HASHES), dtype=np.uint64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    start = 0
+    while start < n:
+        # 이번 묶음에 들어갈 코멘트 범위 [start, stop)
+        stop = max(start + 1, int(np.searchsorted(offsets, offsets[start] + CHUNK_SHINGLES, side="right")) - 1)
+        stop = min(stop, n)
+        hashed = table[codes[offsets[start]:offsets[stop]]]
+        signatures[start:stop] = np.minimum.reduceat(hashed, offsets[start:stop] - offsets[start], axis=0)
+        start = stop
+    return signatures[text_codes]
+
+
+def _connected_components(n, left, right):
+    # 후보 쌍을 간선으로 보고 연결 요소마다 가장 작은 위치를 라벨로 부여 (라벨 전파)
+    labels = np.arange(n)
+    while len(left):
+        smaller = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smaller)
+        np.minimum.at(updated, right, smaller)
+        updated = updated[updated]  # 포인터 점프로 수렴 가속
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return labels
+
+
+def _tones(s):
+    # 코멘트에 들어 있는 평가 어간(TONE_STEMS)
+    return frozenset(stem for stem in TONE_STEMS if stem in s)
+
+
+def _split_from_representative(labels, normalized):
+    """
+    연결 요소는 비슷한 코멘트를 사슬처럼 이어 붙일 수 있으므로(A~B, B~C 이지만 A≁C),
+    묶음마다 대표(가장 앞선 코멘트)와 직접 비교해 실제 2-gram Jaccard가 SIMILARITY 이상이고 평가 어간이 같은 것만 남기고,
+    나머지는 각자 한 건짜리 묶음으로 돌립니다.
+    """
+    members = np.flatnonzero(labels != np.arange(len(labels)))
+    if len(members) == 0:
+        return labels
+    codes, uniques = pd.factorize(normalized)
+    pairs = list(zip(codes[members], codes[labels[members]]))
+    accepted = {}
+    for a, b in dict.fromkeys(pairs):
+        sa, sb = uniques[a], uniques[b]
+        if a == b or _tones(sa) != _tones(sb):
+            accepted[a, b] = a == b
+            continue
+        ga, gb = set(_bigrams(sa)), set(_bigrams(sb))
+        accepted[a, b] = len(ga & gb) >= SIMILARITY * len(ga | gb)
+    rejected = members[~np.fromiter((accepted[p] for p in pairs), dtype=bool, count=len(pairs))]
+    labels = labels.copy()
+    labels[rejected] = rejected
+    return labels
+
+
+def cluster_comments(groups, texts):
+    """
+    같은 그룹(groups: 임원·연도별 번호) 안에서 거의 같은 코멘트끼리 묶고, 묶음별 대표 코멘트의 위치를 반환합니다.
+    (평가자 구분 없이 묶으며, 대표는 묶음에서 가장 앞선 코멘트. 다른 연도 코멘트를 거쳐 이어지지 않도록 연도별로 나눔)
+    """
+    n = len(texts)
+    if n == 0:
+        return np.array([], dtype=np.int32)
+    normalized = normalize_comments(texts)
+    signatures = minhash_signatures(normalized)
+    groups = np.asarray(groups)
+    positions = np.arange(n)
+    group_salt = groups.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+    left, right = [], []
+    for band in range(BANDS):
+        # (임원·연도, 밴드 해시 2개)를 64비트 버킷 키 하나로 합치고, 같은 버킷의 첫 코멘트와만 비교 (버킷 크기에 선형)
+        keys = ((signatures[:, 2 * band] << np.uint64(31)) | signatures[:, 2 * band + 1]) ^ group_salt
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        new_bucket = np.ones(n, dtype=bool)
+        new_bucket[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        first = order[new_bucket][np.cumsum(new_bucket) - 1]
+        partner = np.empty(n, dtype=np.int64)
+        partner[order] = first
+        candidate = partner != positions
+        left.append(positions[candidate])
+        right.append(partner[candidate])
+
+    left, right = np.concatenate(left), np.concatenate(right)
+    similar = (groups[left] == groups[right]) & ((signatures[left] == signatures[right]).mean(axis=1) >= SIMILARITY)
+    labels = _connected_components(n, left[similar], right[similar])
+    return _split_from_representative(labels, normalized).astype(np.int32)
+
+
+def assign_clusters(store):
+    """
+    저장소의 comments 테이블에 cluster(묶음 번호) 컬럼을 붙인 새 저장소를 반환합니다. (파일별로 로드 시 한 번)
+    같은 임원·연도의 코멘트끼리만 묶으므로, 연도별 파일을 따로 올려도 한 파일로 올린 것과 같은 묶음이 나옵니다.
+    """
+    comments = store.comments
+    groups = comments.groupby(["row", "year"], sort=False, observed=True).ngroup().to_numpy()
+    clusters = cluster_comments(groups, comments["text"])
+    return replace(store, comments=comments.assign(cluster=clusters))
+
+
+def collapse(comments):
+    """
+    코멘트 목록을 묶음별 대표 1건으로 줄입니다. 반환 프레임에는 count(묶인 개수)와 raters(평가자 목록)가 붙습니다.
+    대표 순서는 원래 코멘트 순서를 따릅니다.
+    """
+    grouped = comments.groupby("cluster", sort=False)
+    representatives = comments.drop_duplicates("cluster").set_index("cluster")
+    raters = grouped["rater"].agg(lambda r: "·".join(dict.fromkeys(r.astype(str))))
+    return representatives.assign(count=grouped.size(), raters=raters).reset_index()
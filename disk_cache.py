@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+# --- 디스크 캐시 공용 함수 (컬럼형 원본 캐시 ingest, 파싱 결과 보관 history) ---
+
+
+def remove_quietly(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def write_atomic(path, write):
+    """
+    같은 폴더의 임시 파일에 write(임시 경로)로 쓴 뒤 교체합니다. (쓰는 도중 다른 세션/프로세스가 반쯤 쓴 파일을 읽지 않도록)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def evict(cache_dir, max_bytes, suffix, keep, companions=()):
+    """
+    suffix로 끝나는 파일을 최근 사용 시각(mtime) 기준 LRU로 정리해 합계를 max_bytes 이하로 맞춥니다.
+    companions에 준 접미사의 같은 이름 파일(예: 목록 정보 .json)도 함께 지웁니다.
+    """
+    entries = []
+    for fname in os.listdir(cache_dir):
+        if not fname.endswith(suffix):
+            continue
+        path = os.path.join(cache_dir, fname)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        base = path[:-len(suffix)]
+        remove_quietly(path, *(base + c for c in companions))
+        total -= size
@@ -0,0 +1,251 @@
+"""
+전체 임원의 리더십 진단 리포트(HTML)와 요약 엑셀을 한 번에 만드는 내보내기 도구입니다.
+Streamlit 없이 실행되며, 지표/차트/피드백은 대시보드와 같은 함수로 만들고 AI 결과는 결과 캐시(llm_cache)에 있는 것만 넣습니다.
+인터넷 없이 열리도록 plotly.js는 출력 폴더에 한 번만 복사해 각 HTML이 참조합니다. (--inline-js 면 파일마다 포함)
+
+사용 예:
+    python export.py 리더십진단_22-24.xlsx --out exports --workers 8
+    python export.py 22년.xlsx 23년.xlsx 24년.xlsx --limit 20 --timings export_timings.json
+"""
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from charts import radar_figure, trend_figure
+from dataset import get_dataset
+from llm_cache import get_cache
+from percentiles import OVERALL
+from prompts import MODEL, leader_prompts
+from scoring import leader_scores, strongest_weakest
+from store import MEMBER
+
+EXPORT_DIR = "exports"
+CHUNK_SIZE = 25  # 작업 프로세스에 한 번에 넘기는 임원 수
+STAGES = ("compute", "figures", "cache", "html", "write")
+
+# 작업 프로세스가 공유하는 읽기 전용 데이터셋
+# (fork 방식이면 부모 프로세스에서 만든 객체를 복사 없이 그대로 사용, 아니면 프로세스마다 한 번 로드)
+_dataset = None
+
+
+def _init_worker(files):
+    global _dataset
+    if _dataset is None:
+        _dataset = get_dataset(files)
+
+
+def _safe_filename(text):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", str(text)).strip("_") or "leader"
+
+
+def _paragraphs(text):
+    return html.escape(text).replace("\n", "<br>")
+
+
+REPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{plotly_js}
+<style>
+body {{ font-family: 'Pretendard', 'Malgun Gothic', sans-serif; max-width: 1100px; margin: 32px auto; color: #1f2937; }}
+h1 {{ font-size: 1.6rem; }} h2 {{ font-size: 1.15rem; margin-top: 32px; border-bottom: 1px solid #e5e7eb; padding-bottom: 6px; }}
+.metrics {{ display: flex; gap: 16px; }} .metric {{ flex: 1; background: #f8fafc; border-radius: 8px; padding: 12px 16px; }}
+.metric .label {{ color: #6b7280; font-size: 0.85rem; }} .metric .value {{ font-size: 1.4rem; font-weight: 600; }}
+.charts {{ display: flex; gap: 16px; }} .charts > div {{ flex: 1; min-width: 0; }}
+blockquote {{ margin: 6px 0; padding: 4px 12px; border-left: 3px solid #cbd5e1; }}
+.ai {{ background: #eff6ff; border-radius: 8px; padding: 12px 16px; }}
+</style>
+</head>
+<body>
+<h1>📊 {name} 님 리더십 진단 분석</h1>
+<div>{meta}</div>
+<h2>Overview (구성원 응답 기준)</h2>
+<div class="metrics">
+  <div class="metric"><div class="label">{latest_year} 종합 점수</div><div class="value">{score}</div><div>{delta}</div><div>{standing}</div></div>
+  <div class="metric"><div class="label">최고 강점</div><div class="value">{top}</div></div>
+  <div class="metric"><div class="label">보완 필요</div><div class="value">{bot}</div></div>
+</div>
+<div class="charts">
+  <div><h2>📅 리더십 종합 점수 추이</h2>{fig_line}</div>
+  <div><h2>🕸️ 리더십 영역별 변화 ({latest_year})</h2>{fig_radar}</div>
+</div>
+<h2>💬 {latest_year} 주요 피드백</h2>
+{highlights}
+<h2>🤖 AI 3줄 핵심 요약</h2>
+<div class="ai">{summary}</div>
+<h2>📝 주관식 심층 분석</h2>
+<div class="ai">{analysis}</div>
+</body>
+</html>
+"""
+
+
+def render_leader(dataset, row, out_dir, inline_js, timings):
+    """
+    임원 한 명의 HTML 리포트를 쓰고, 요약 엑셀에 들어갈 한 행(dict)을 반환합니다. 단계별 소요 시간은 timings에 누적합니다.
+    """
+    started = time.perf_counter()
+    sorted_years = dataset.years
+    latest_year = sorted_years[-1]
+    prev_year = sorted_years[-2] if len(sorted_years) > 1 else None
+    detailed_scores, grouped_scores, avg_scores = leader_scores(dataset.cohort, row)
+    latest_series, top_comp, bot_comp = strongest_weakest(detailed_scores[latest_year])
+    curr_score = avg_scores[latest_year]
+    delta_total = (curr_score - avg_scores[prev_year]) if prev_year else 0
+    standing = dataset.cohort.standing(row)
+    overall = standing.loc[("overall", latest_year, OVERALL)]
+    comments = dataset.store.comments_for(row=row, year=latest_year)
+    prompts = leader_prompts(dataset, row)
+    meta = dataset.row(row)
+    name = meta[dataset.name_col]
+    checkpoint = time.perf_counter()
+    timings["compute"] += checkpoint - started
+
+    fig_line = trend_figure(sorted_years, avg_scores, standing)
+    fig_radar = radar_figure(sorted_years, grouped_scores, latest_year, standing)
+    line_div = pio.to_html(fig_line, full_html=False, include_plotlyjs=False)
+    radar_div = pio.to_html(fig_radar, full_html=False, include_plotlyjs=False)
+    timings["figures"] += time.perf_counter() - checkpoint
+    checkpoint = time.perf_counter()
+
+    # 읽기 전용 조회라 여러 작업 프로세스가 동시에 읽어도 캐시 통계/정리 순서에 영향 없음
+    cache = get_cache()
+    summary = cache.peek(MODEL, prompts["summary"]) if prompts["summary"] else None
+    analysis = cache.peek(MODEL, prompts["analysis"])
+    timings["cache"] += time.perf_counter() - checkpoint
+    checkpoint = time.perf_counter()
+
+    highlights = "\n".join(
+        f"<blockquote>{'👤' if rater == MEMBER else '🤝'} <b>{html.escape(str(rater))}:</b> {html.escape(str(text))}</blockquote>"
+        for rater, text in zip(comments["rater"], comments["text"])
+    ) or "<p>해당 연도의 주관식 데이터가 없습니다.</p>"
+    page = REPORT_TEMPLATE.format(
+        title=html.escape(f"{name} 리더십 진단 리포트"),
+        plotly_js=f"<script>{get_plotlyjs()}</script>" if inline_js else '<script src="plotly.min.js"></script>',
+        name=html.escape(str(name)),
+        meta=" · ".join(html.escape(f"{k}: {v}") for k, v in meta.items() if k != dataset.name_col and pd.notna(v)),
+        latest_year=latest_year,
+        score=f"{curr_score:.2f}",
+        delta=f"{delta_total:+.2f} ({prev_year} 대비)" if prev_year else "",
+        standing=f"전체 {overall['n']:,}명 중 {overall['band']} (백분위 {overall['percentile']:.0f})" if overall["percentile"] == overall["percentile"] else "",
+        top=html.escape(str(top_comp)),
+        bot=html.escape(str(bot_comp)),
+        fig_line=line_div,
+        fig_radar=radar_div,
+        highlights=highlights,
+        summary=_paragraphs(summary) if summary else "아직 생성된 AI 요약이 없습니다.",
+        analysis=_paragraphs(analysis) if analysis else "아직 생성된 AI 심층 분석이 없습니다.",
+    )
+    timings["html"] += time.perf_counter() - checkpoint
+    checkpoint = time.perf_counter()
+
+    filename = f"{row + 1:05d}_{_safe_filename(name)}.html"
+    with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+        f.write(page)
+    timings["write"] += time.perf_counter() - checkpoint
+
+    return {
+        "순번": row + 1,
+        **{k: v for k, v in meta.items()},
+        f"{latest_year} 종합 점수": round(curr_score, 2),
+        "전년 대비": round(delta_total, 2) if prev_year else None,
+        "백분위": round(overall["percentile"], 1) if overall["percentile"] == overall["percentile"] else None,
+        "구간": overall["band"],
+        "최고 강점": top_comp,
+        "보완 필요": bot_comp,
+        **{f"{latest_year} {group}": round(score, 2) for group, score in grouped_scores[latest_year].items()},
+        "AI 요약": summary or "",
+        "AI 심층 분석": "있음" if analysis else "없음",
+        "리포트": filename,
+    }
+
+
+def render_chunk(rows, out_dir, inline_js):
+    timings = defaultdict(float)
+    summaries = [render_leader(_dataset, row, out_dir, inline_js, timings) for row in rows]
+    return summaries, dict(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전체 임원 리더십 진단 리포트(HTML) + 요약 엑셀 내보내기")
+    parser.add_argument("files", nargs="+", help="리더십 진단 결과 파일 (xlsx/csv, 연도별 여러 개 가능)")
+    parser.add_argument("--out", default=EXPORT_DIR, help="출력 폴더")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="작업 프로세스 수")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="작업 단위(임원 수)")
+    parser.add_argument("--inline-js", action="store_true", help="plotly.js를 HTML 파일마다 포함 (파일 하나로 공유 가능, 용량 큼)")
+    parser.add_argument("--limit", type=int, help="앞에서부터 N명만 처리")
+    parser.add_argument("--timings", help="단계별 소요 시간을 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    global _dataset
+    wall = {}
+    started = time.perf_counter()
+    files = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            files.append((os.path.basename(path), f.read()))
+    _dataset = get_dataset(files)
+    wall["load"] = time.perf_counter() - started
+
+    rows = list(range(len(_dataset.leaders)))[:args.limit]
+    if not rows:
+        print("내보낼 임원이 없습니다.")
+        return 0
+    chunks = [rows[i:i + args.chunk_size] for i in range(0, len(rows), args.chunk_size)]
+    os.makedirs(args.out, exist_ok=True)
+    if not args.inline_js:
+        with open(os.path.join(args.out, "plotly.min.js"), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+    print(f"임원 {len(rows):,}명 · 작업 {len(chunks):,}개 · 프로세스 {args.workers}개 → {args.out}")
+
+    started = time.perf_counter()
+    summaries, stage_totals = [], defaultdict(float)
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(args.workers, mp_context=context, initializer=_init_worker, initargs=(files,)) as pool:
+        futures = [pool.submit(render_chunk, chunk, args.out, args.inline_js) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), 1):
+            chunk_summaries, chunk_timings = future.result()
+            summaries += chunk_summaries
+            for stage, seconds in chunk_timings.items():
+                stage_totals[stage] += seconds
+            if done % 10 == 0 or done == len(futures):
+                print(f"  {len(summaries):,}/{len(rows):,} 완료 · {time.perf_counter() - started:.1f}초", flush=True)
+    wall["render"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary_path = os.path.join(args.out, "리더십진단_요약.xlsx")
+    pd.DataFrame(summaries).sort_values("순번").to_excel(summary_path, index=False, sheet_name="요약")
+    wall["excel"] = time.perf_counter() - started
+
+    total = sum(wall.values())
+    print(f"완료 · 리포트 {len(summaries):,}건 + {summary_path} · {total:.1f}초")
+    print("단계별 소요 시간 (실제 경과)")
+    for stage, seconds in wall.items():
+        print(f"  {stage:<8} {seconds:8.2f}초")
+    print("리포트 생성 단계별 (작업 프로세스 합계, 임원당 평균)")
+    for stage in STAGES:
+        seconds = stage_totals.get(stage, 0.0)
+        per_leader = seconds / len(summaries) * 1000 if summaries else 0.0
+        print(f"  {stage:<8} {seconds:8.2f}초  {per_leader:7.1f}ms/명")
+
+    if args.timings:
+        with open(args.timings, "w", encoding="utf-8") as f:
+            json.dump({"leaders": len(summaries), "workers": args.workers, "wall": wall, "stages": dict(stage_totals)}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import json
+import os
+import pickle
+import time
+
+from disk_cache import evict, remove_quietly, write_atomic
+
+# --- 파싱 결과 보관 설정 ---
+# 업로드 파일별 파싱 결과(dataset.Partition: 임원/연도 키의 long-format 저장소 등)를 파일 내용 해시 이름으로 저장해 두고,
+# 앱을 다시 시작해도 원본을 다시 올리거나 파싱하지 않고 불러옵니다. 같은 이름의 .json에는 목록 화면용 정보를 둡니다.
+# 보관 폴더는 서버(프로세스) 전체가 함께 쓰므로, 목록에는 이 서버에서 올라온 파일이 세션 구분 없이 모두 나옵니다.
+HISTORY_DIR = os.environ.get("COACH_HISTORY_DIR", os.path.join(".cache", "partitions"))
+HISTORY_MAX_BYTES = int(os.environ.get("COACH_HISTORY_MAX_MB", "2048")) * 1024 * 1024
+FORMAT_VERSION = 2  # 저장 구조(Partition 필드)나 키워드/묶음 규칙이 바뀌면 올려서 이전 버전 파일은 무시
+DATA_SUFFIX = f".v{FORMAT_VERSION}.pkl"
+INFO_SUFFIX = f".v{FORMAT_VERSION}.json"
+
+
+def _paths(file_hash, history_dir):
+    base = os.path.join(history_dir, file_hash)
+    return base + DATA_SUFFIX, base + INFO_SUFFIX
+
+
+def _write(path, data):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+    write_atomic(path, write)
+
+
+def save(file_hash, obj, info, history_dir=None, max_bytes=None):
+    """
+    파싱 결과를 보관합니다. info(파일명, 연도, 임원 수 등)는 entries() 목록에 그대로 나옵니다.
+    저장 실패(권한, 용량 등)는 무시하고, 다음에 같은 파일이 올라오면 다시 파싱합니다.
+    """
+    history_dir = history_dir or HISTORY_DIR
+    max_bytes = HISTORY_MAX_BYTES if max_bytes is None else max_bytes
+    data_path, info_path = _paths(file_hash, history_dir)
+    try:
+        os.makedirs(history_dir, exist_ok=True)
+        _write(data_path, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+        info = {**info, "file_hash": file_hash, "saved_at": time.time()}
+        _write(info_path, json.dumps(info, ensure_ascii=False).encode("utf-8"))
+        evict(history_dir, max_bytes, DATA_SUFFIX, keep=data_path, companions=(INFO_SUFFIX,))
+    except (OSError, pickle.PicklingError):
+        pass
+
+
+def load(file_hash, history_dir=None):
+    """
+    보관한 파싱 결과를 읽습니다. 없거나 읽을 수 없으면 None
+    손상되었거나 다른 pandas/numpy 버전에서 저장해 풀리지 않는 파일(TypeError, ValueError 등 어떤 오류든)은 지우고,
+    호출한 쪽은 원본이 있으면 다시 파싱합니다.
+    """
+    data_path, info_path = _paths(file_hash, history_dir or HISTORY_DIR)
+    try:
+        with open(data_path, "rb") as f:
+            obj = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        remove_quietly(data_path, info_path)
+        return None
+    try:
+        os.utime(data_path)
+    except OSError:
+        pass
+    return obj
+
+
+def entries(history_dir=None):
+    """
+    보관 중인 파일 목록(info dict)을 저장 시각 순으로 반환합니다. (세션/사용자 구분 없는 서버 전체 목록)
+    """
+    history_dir = history_dir or HISTORY_DIR
+    try:
+        names = os.listdir(history_dir)
+    except OSError:
+        return []
+    result = []
+    for fname in names:
+        if not fname.endswith(INFO_SUFFIX):
+            continue
+        info_path = os.path.join(history_dir, fname)
+        if not os.path.exists(info_path[:-len(INFO_SUFFIX)] + DATA_SUFFIX):
+            continue
+        try:
+            with open(info_path, encoding="utf-8") as f:
+                result.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(result, key=lambda info: info["saved_at"])
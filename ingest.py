@@ -0,0 +1,73 @@
+import hashlib
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from disk_cache import evict, remove_quietly, write_atomic
+
+# --- 컬럼형 캐시 설정 ---
+# 업로드된 원본(xlsx/csv)을 SHA-256 이름의 Arrow IPC 파일로 변환해 두고, 이후에는 메모리 맵으로 바로 읽습니다.
+CACHE_DIR = os.environ.get("COACH_CACHE_DIR", os.path.join(".cache", "workbooks"))
+CACHE_MAX_BYTES = int(os.environ.get("COACH_CACHE_MAX_MB", "1024")) * 1024 * 1024
+CACHE_SUFFIX = ".arrow"
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _parse(name, data):
+    if name.endswith('.csv'):
+        return pd.read_csv(io.BytesIO(data))
+    return pd.read_excel(io.BytesIO(data))
+
+
+def _columnar_safe(df):
+    """
+    Arrow로 저장 가능한 형태로 정리합니다.
+    (컬럼명은 문자열, 숫자/문자가 섞인 주관식 컬럼은 문자열로 통일)
+    """
+    df = df.reset_index(drop=True)
+    df.columns = [str(c) for c in df.columns]
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda v: v if pd.isna(v) or isinstance(v, str) else str(v))
+    return df
+
+
+def _write(df, path, cache_dir, max_bytes):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # 메모리 맵으로 바로 읽을 수 있도록 비압축으로 저장
+    write_atomic(path, lambda tmp_path: feather.write_feather(table, tmp_path, compression="uncompressed"))
+    evict(cache_dir, max_bytes, CACHE_SUFFIX, keep=path)
+
+
+def load_workbook(name, data, cache_dir=None, max_bytes=None):
+    """
+    업로드 파일을 DataFrame으로 읽습니다.
+    같은 내용의 파일은 앱 재시작 이후에도 컬럼형 캐시에서 읽고, 처음 보는 파일만 원본을 파싱합니다.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    path = os.path.join(cache_dir, file_digest(data) + CACHE_SUFFIX)
+
+    if os.path.exists(path):
+        try:
+            table = feather.read_table(path, memory_map=True)
+            os.utime(path)
+            return table.to_pandas()
+        except (OSError, pa.ArrowException):
+            # 손상된 캐시는 지우고 원본을 다시 파싱
+            remove_quietly(path)
+
+    df = _columnar_safe(_parse(name, data))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write(df, path, cache_dir, max_bytes)
+    except (OSError, ValueError, pa.ArrowException):
+        # 캐시 저장 실패(권한, 중복 컬럼명 등)는 무시하고 파싱 결과만 사용
+        pass
+    return df
@@ -0,0 +1,241 @@
+from dataclasses import dataclass
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from store import MEMBER, PEER, RATERS
+
+# --- 주관식 키워드 분석 설정 ---
+TOKEN_PATTERN = r"[가-힣]{2,}|[A-Za-z][A-Za-z0-9]+"
+TOP_N = 8
+
+# 명사 뒤 조사/서술격 어미 (긴 것부터 비교, 한 번만 떼어냄: 권한위임을 → 권한위임)
+PARTICLES = sorted([
+    "에서는", "에서도", "에게서", "으로는", "으로도", "이라는", "라는", "에서", "에게", "으로", "까지", "부터", "처럼", "보다",
+    "에는", "에도", "이나", "이며", "이고", "입니다", "임", "은", "는", "이", "가", "을", "를", "에", "의", "도", "로", "과", "와", "만",
+], key=len, reverse=True)
+# 하다 용언 어미: 앞의 명사만 남김 (강화해 → 강화, 부족합니다 → 부족, 탁월하심 → 탁월)
+HA_ENDINGS = sorted([
+    "했습니다", "하였습니다", "하셨습니다", "합니다", "하십니다", "해주십니다", "해주셔서", "해주시면", "해주셨으면", "하였음", "했음",
+    "하셨음", "하심", "하지만", "하면서", "하면", "하며", "하여", "해서", "하게", "하는", "하고", "하신", "하시는", "하셔서", "해야",
+    "해요", "해", "한", "함",
+], key=len, reverse=True)
+# 그 밖의 용언 어미: 어간을 명사형으로 바꿈 (좋습니다 → 좋음, 뛰어나십니다 → 뛰어남, 빠르게 → 빠름). 2자 미만이 되면 버림
+VERB_ENDINGS = sorted([
+    "습니다", "십니다", "셨습니다", "셨음", "셔서", "시면", "셨으면", "시고", "시는", "으면", "면서", "다면", "어서", "아서", "지만",
+    "는데", "도록", "세요", "어요", "아요", "게",
+], key=len, reverse=True)
+
+STOPWORDS = {
+    "있음", "없음", "있는", "없는", "있고", "있어", "있다", "없다", "대한", "대해", "위해", "통해", "매우", "너무", "항상", "가장",
+    "그리고", "하지만", "그러나", "또한", "다만", "특히", "조금", "많이", "정말", "계속", "함께", "이런", "그런", "이러한",
+    "생각", "부분", "경우", "모습", "같음", "같습니다", "좋겠음", "좋겠습니다", "바랍니다", "필요", "임원", "리더", "리더님",
+    "상무님", "전무님", "부사장님", "본부장님", "the", "and", "for",
+    # 용언 원형 잔여 (보조 용언/관형형)
+    "됨", "해줌", "보임", "바람", "하는", "바쁜", "어려운", "좋은", "많은", "새로운", "다른", "모든", "같은", "빠른", "높은", "낮은",
+    # 부사/때를 나타내는 말
+    "다소", "특별히", "평소", "와중", "더욱", "좀더", "자주", "꾸준히", "충분히", "다시", "먼저", "앞으로", "모두", "아직", "이미",
+    "현재", "지금", "최근",
+}
+
+
+def _nominalize(stem):
+    # 용언 어간 → 명사형 (뛰어나 → 뛰어남, 좋 → 좋음, 아쉽 → 아쉬움)
+    code = ord(stem[-1]) - 0xAC00
+    if not 0 <= code < 11172:
+        return stem
+    final = code % 28
+    if final == 0:
+        return stem[:-1] + chr(ord(stem[-1]) + 16)  # 받침 ㅁ
+    if final == 17 and len(stem) >= 2:
+        return stem[:-1] + chr(ord(stem[-1]) - 17) + "움"  # ㅂ 불규칙
+    return stem + "음"
+
+
+def normalize_token(token):
+    """
+    어절을 키워드 원형으로 바꿉니다. 용언이 아니면 조사를 한 번만 떼어냄 (소통에서도 → 소통, 업무성과를 → 업무성과)
+    하다 용언은 앞 명사로(부족합니다 → 부족), 그 밖의 용언은 명사형으로(빠릅니다 → 빠름) 바꾸고, 키워드가 못 되면 빈 문자열
+    """
+    for ending in HA_ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= 2:
+            return token[:-len(ending)]
+    if token.endswith("입니다"):
+        return token[:-3] if len(token) >= 5 else ""
+    stem = None
+    for ending in VERB_ENDINGS:
+        if token.endswith(ending) and len(token) > len(ending):
+            stem = token[:-len(ending)]
+            break
+    else:
+        last = ord(token[-3]) - 0xAC00 if token.endswith("니다") and len(token) >= 3 else -1
+        if 0 <= last < 11172 and last % 28 == 17:
+            stem = token[:-3] + chr(ord(token[-3]) - 17)  # 빠릅니다 → 빠르
+    if stem is not None:
+        stem = _nominalize(stem)
+        return stem if len(stem) >= 2 else ""
+    for particle in PARTICLES:
+        if token.endswith(particle) and len(token) - len(particle) >= 2:
+            return token[:-len(particle)]
+    return token
+
+
+@dataclass(frozen=True)
+class KeywordIndex:
+    """
+    전체 임원 주관식 코멘트의 키워드 빈도 행렬입니다. (파일별로 한 번 만들고, 합칠 때는 이어 붙이기만 함)
+    - terms: 키워드 사전 (코드 → 키워드)
+    - counts: row(int32) / year·rater(category) / term(int32 코드) / count(int32) 의 희소(COO) 테이블, row 기준 정렬
+    """
+    terms: np.ndarray
+    counts: pd.DataFrame
+
+    def counts_for(self, row):
+        rows = self.counts["row"].to_numpy()
+        start, stop = np.searchsorted(rows, [row, row + 1])
+        return self.counts.iloc[start:stop]
+
+
+def build_keyword_index(store):
+    comments = store.comments
+    tokens = comments["text"].astype(str).str.findall(TOKEN_PATTERN)
+    positions = np.repeat(np.arange(len(comments)), tokens.str.len().to_numpy(dtype=np.int64))
+    flat = list(chain.from_iterable(tokens))
+
+    # 어절 원형은 종류가 적으므로 고유 어절에만 정규화를 적용하고 코드로 되돌림
+    surface_codes, surfaces = pd.factorize(pd.Series(flat, dtype=object))
+    stem_codes, terms = pd.factorize(pd.Index([normalize_token(s) for s in surfaces], dtype=object))
+    term_codes = stem_codes[surface_codes] if len(flat) else np.array([], dtype=np.int64)
+    keep = ~(terms.isin(STOPWORDS) | (terms == ""))[term_codes] if len(flat) else np.array([], dtype=bool)
+
+    # 연도/평가자는 저장소와 같은 category로 유지 (object로 풀면 빈도 테이블이 몇 배로 커짐)
+    source = positions[keep]
+    counts = (
+        pd.DataFrame({
+            "row": comments["row"].to_numpy()[source],
+            "year": comments["year"].array.take(source),
+            "rater": comments["rater"].array.take(source),
+            "term": term_codes[keep].astype(np.int32),
+        })
+        .groupby(["row", "year", "rater", "term"], observed=True, sort=True).size()
+        .rename("count").astype(np.int32).reset_index()
+    )
+    return KeywordIndex(terms=terms.to_numpy(dtype=object), counts=counts)
+
+
+def _year_codes(table, years):
+    # 파일별 연도 category 코드를 합친 연도 목록 기준 코드로 변환
+    return pd.Index(years).get_indexer(table["year"].cat.categories)[table["year"].cat.codes.to_numpy()]
+
+
+def _segment_keys(table, row_map, years):
+    # (임원, 연도, 평가자) 구간을 정수 키 하나로
+    rows = row_map[table["row"].to_numpy()].astype(np.int64)
+    return (rows * len(years) + _year_codes(table, years)) * len(RATERS) + table["rater"].cat.codes.to_numpy()
+
+
+def merge_keyword_indexes(parts, years):
+    """
+    파일(파티션)별 키워드 색인을 전체 임원 기준으로 이어 붙입니다. (토큰화/집계는 다시 하지 않음)
+    parts는 (KeywordIndex, 파일 comments 테이블, 전체 행 위치 배열) 목록이며, 뒤에 올수록 최신 파일입니다.
+    같은 임원/연도/평가자 구간은 주관식 저장소(store.merge_stores)와 같이 코멘트가 있는 가장 최신 파일의 빈도만 남깁니다.
+    """
+    segments = [_segment_keys(comments, row_map, years) for _, comments, row_map in parts]
+    owners = np.repeat(np.arange(len(parts)), [len(s) for s in segments])
+    # 구간별 마지막 파일 번호 (뒤집은 배열에서 처음 나오는 위치 = 원래 배열의 마지막)
+    keys, last = np.unique(np.concatenate(segments)[::-1], return_index=True)
+    newest = owners[::-1][last]
+
+    terms = pd.Index(np.concatenate([index.terms for index, _, _ in parts]), dtype=object).unique()
+    tables = []
+    for part, (index, _, row_map) in enumerate(parts):
+        counts = index.counts
+        counts = counts[newest[np.searchsorted(keys, _segment_keys(counts, row_map, years))] == part]
+        tables.append(pd.DataFrame({
+            "row": row_map[counts["row"].to_numpy()].astype(np.int32),
+            "year": pd.Categorical.from_codes(_year_codes(counts, years), categories=years),
+            "rater": pd.Categorical.from_codes(counts["rater"].cat.codes.to_numpy(), categories=RATERS),
+            "term": terms.get_indexer(index.terms)[counts["term"].to_numpy()].astype(np.int32),
+            "count": counts["count"].to_numpy(),
+        }))
+    counts = pd.concat(tables, ignore_index=True).sort_values("row", kind="stable").reset_index(drop=True)
+    return KeywordIndex(terms=terms.to_numpy(dtype=object), counts=counts)
+
+
+def _shares(matrix):
+    # 열(연도/평가자)별 전체 언급 수 대비 비율
+    totals = matrix.sum(axis=0)
+    return matrix / np.where(totals == 0, 1, totals)
+
+
+def _format_terms(terms, counts):
+    return ", ".join(f"{t}({c})" for t, c in zip(terms, counts))
+
+
+def leader_keywords(index, row, years, top_n=TOP_N):
+    """
+    한 임원의 연도별/평가자별 상위 키워드, 첫해 대비 최근 연도 증감, 구성원 vs 동료 대비를 계산합니다.
+    """
+    sliced = index.counts_for(row)
+    # 키워드 × (평가자, 연도) 빈도 행렬 (희소 테이블의 해당 임원 구간을 바로 채움)
+    rater_pos = pd.Index(RATERS).get_indexer(sliced["rater"].astype(str))
+    year_pos = pd.Index(years).get_indexer(sliced["year"].astype(str))
+    keep = (rater_pos >= 0) & (year_pos >= 0)
+    term_codes, term_ids = pd.factorize(sliced["term"].to_numpy()[keep])
+    matrix = np.zeros((len(term_ids), len(RATERS) * len(years)), dtype=np.int64)
+    np.add.at(matrix, (term_codes, rater_pos[keep] * len(years) + year_pos[keep]), sliced["count"].to_numpy()[keep])
+    table = pd.DataFrame(
+        matrix, index=pd.Index(index.terms[term_ids], name="term"), columns=pd.MultiIndex.from_product([RATERS, years])
+    ).sort_index()
+
+    yearly = pd.DataFrame(index=pd.Index(years, name="연도"), columns=RATERS, dtype=object)
+    for rater in RATERS:
+        for year in years:
+            top = table[(rater, year)].nlargest(top_n)
+            top = top[top > 0]
+            yearly.loc[year, rater] = _format_terms(top.index, top.to_numpy()) or "-"
+
+    result = {"yearly": yearly, "first_year": years[0], "last_year": years[-1],
+              "rising": [], "falling": [], "member_more": [], "peer_more": []}
+    if table.empty:
+        return result
+
+    # 연도별 합계(구성원+동료) 기준 비율 변화로 증가/감소 키워드 선정
+    by_year = table[MEMBER].to_numpy() + table[PEER].to_numpy()
+    first, last = by_year[:, 0], by_year[:, -1]
+    shares = _shares(by_year)
+    delta = shares[:, -1] - shares[:, 0]
+    labels = table.index.to_numpy()
+    if len(years) > 1:
+        order = np.argsort(-delta, kind="stable")
+        result["rising"] = [f"{labels[i]}({first[i]}→{last[i]})" for i in order[:top_n] if delta[i] > 0 and last[i] > first[i]]
+        order = np.argsort(delta, kind="stable")
+        result["falling"] = [f"{labels[i]}({first[i]}→{last[i]})" for i in order[:top_n] if delta[i] < 0 and last[i] < first[i]]
+
+    # 전체 연도 합계 기준 구성원/동료 언급 비율 차이
+    by_rater = np.column_stack([table[MEMBER].to_numpy().sum(axis=1), table[PEER].to_numpy().sum(axis=1)])
+    rater_shares = _shares(by_rater)
+    gap = rater_shares[:, 0] - rater_shares[:, 1]
+    if by_rater[:, 0].sum() and by_rater[:, 1].sum():
+        contrast = [f"{labels[i]}({rater_shares[i, 0]:.0%}:{rater_shares[i, 1]:.0%})" for i in range(len(labels))]
+        order = np.argsort(-gap, kind="stable")
+        result["member_more"] = [contrast[i] for i in order[:top_n] if gap[i] > 0]
+        order = np.argsort(gap, kind="stable")
+        result["peer_more"] = [contrast[i] for i in order[:top_n] if gap[i] < 0]
+    return result
+
+
+def format_keyword_table(keywords):
+    """
+    심층 분석 프롬프트에 넣는 간결한 키워드 집계 텍스트입니다. (괄호 안은 언급 횟수, 평가자 비교는 언급 비율)
+    """
+    text = ""
+    for year, row in keywords["yearly"].iterrows():
+        text += f"<{year}> 구성원: {row[MEMBER]} / 동료: {row[PEER]}\n"
+    span = f"{keywords['first_year']}→{keywords['last_year']}"
+    text += f"- {span} 증가 키워드: {', '.join(keywords['rising']) or '-'}\n"
+    text += f"- {span} 감소 키워드: {', '.join(keywords['falling']) or '-'}\n"
+    text += f"- 구성원이 더 자주 언급 (구성원:동료 언급 비율): {', '.join(keywords['member_more']) or '-'}\n"
+    text += f"- 동료가 더 자주 언급 (구성원:동료 언급 비율): {', '.join(keywords['peer_more']) or '-'}\n"
+    return text
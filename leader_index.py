@@ -0,0 +1,131 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# --- 한글 자모 분해 ---
+# 완성형 음절을 호환 자모로 풀어 두면 입력 중인 글자(예: '기' -> '김')나 초성('ㄱㄷ')으로도 접두어 검색이 됩니다.
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+
+_JAMO_TABLE = {}
+_CHOSEONG_TABLE = {}
+for _code in range(11172):
+    _cho, _rest = divmod(_code, 588)
+    _jung, _jong = divmod(_rest, 28)
+    _JAMO_TABLE[0xAC00 + _code] = CHOSEONG[_cho] + JUNGSEONG[_jung] + JONGSEONG[_jong]
+    _CHOSEONG_TABLE[0xAC00 + _code] = CHOSEONG[_cho]
+
+SEARCH_LIMIT = 200
+
+
+def to_jamo(text):
+    return str(text).translate(_JAMO_TABLE).replace(" ", "").lower()
+
+
+def to_choseong(text):
+    return str(text).translate(_CHOSEONG_TABLE).replace(" ", "").lower()
+
+
+def _is_choseong(text):
+    return bool(text) and all(ch in CHOSEONG for ch in text)
+
+
+def _prefix_rows(keys, rows, prefix):
+    start = bisect_left(keys, prefix)
+    stop = bisect_left(keys, prefix + "\uffff")
+    return rows[start:stop]
+
+
+def _sorted_keys(pairs):
+    pairs = sorted(pairs)
+    return [k for k, _ in pairs], [r for _, r in pairs]
+
+
+@dataclass(frozen=True)
+class LeaderIndex:
+    """
+    데이터셋당 한 번 만드는 임원 색인입니다.
+    - 이름/사번 -> 행 위치 해시맵 (주소의 ?leader= 값, 데이터셋이 바뀌어도 같은 임원을 다시 찾을 때 사용)
+    - 자모/초성 분해 키를 정렬해 둔 배열 (접두어 검색은 이진 탐색)
+    - 동명이인은 메타 컬럼(사번, 소속 등)을 붙인 표시명으로 구분
+    """
+    names: list  # 행 위치 -> 이름
+    labels: list  # 행 위치 -> 표시명 (동명이인 구분)
+    ids: list  # 행 위치 -> 사번 (사번 컬럼이 없으면 빈 목록)
+    by_name: dict  # 이름 -> 행 위치 목록
+    by_id: dict  # 사번 -> 행 위치
+    _jamo: tuple
+    _choseong: tuple
+    _ids: tuple
+
+    def __len__(self):
+        return len(self.names)
+
+    def key(self, pos):
+        """행 위치를 다른 데이터셋에서도 통하는 키로 (사번, 없으면 이름, 동명이인은 이름#순번)"""
+        if self.ids:
+            return self.ids[pos]
+        name = self.names[pos]
+        rows = self.by_name[name]
+        return name if len(rows) == 1 else f"{name}#{rows.index(pos)}"
+
+    def lookup(self, key):
+        """사번, 이름 또는 key()가 만든 이름#순번으로 행 위치를 찾습니다. (이름만 주면 첫 번째, 없으면 None)"""
+        key = str(key)
+        if key in self.by_id:
+            return self.by_id[key]
+        rows = self.by_name.get(key)
+        if rows:
+            return rows[0]
+        name, sep, nth = key.rpartition("#")
+        rows = self.by_name.get(name) if sep and nth.isdigit() else None
+        return rows[int(nth)] if rows and int(nth) < len(rows) else None
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        이름(자모/초성) 또는 사번 접두어로 행 위치 목록을 찾습니다.
+        """
+        query = str(query).strip()
+        if not query:
+            return list(range(min(limit, len(self.names))))
+
+        compact = query.replace(" ", "").lower()
+        if _is_choseong(compact):
+            rows = _prefix_rows(*self._choseong, compact)
+        else:
+            rows = _prefix_rows(*self._jamo, to_jamo(query))
+        rows = rows + _prefix_rows(*self._ids, compact)
+        return sorted(dict.fromkeys(rows))[:limit]
+
+
+def build_leader_index(meta, name_col, id_col=None):
+    names = meta[name_col].astype(str).tolist()
+    by_name = {}
+    for pos, name in enumerate(names):
+        by_name.setdefault(name, []).append(pos)
+
+    ids = meta[id_col].astype(str).tolist() if id_col else []
+    by_id = {leader_id: pos for pos, leader_id in reversed(list(enumerate(ids)))}
+
+    # 동명이인 표시명: 이름 (사번 · 기타 메타 값)
+    extra_cols = ([id_col] if id_col else []) + [c for c in meta.columns if c not in (name_col, id_col)]
+    duplicated = meta[name_col].astype(str).duplicated(keep=False).to_numpy()
+    labels = list(names)
+    detail_rows = meta.loc[duplicated, extra_cols[:2]].itertuples(index=False, name=None)
+    for pos, values in zip(np.flatnonzero(duplicated).tolist(), detail_rows):
+        details = [str(v) for v in values if pd.notna(v)]
+        labels[pos] = f"{names[pos]} ({' · '.join(details) or pos + 1})"
+
+    return LeaderIndex(
+        names=names,
+        labels=labels,
+        ids=ids,
+        by_name=by_name,
+        by_id=by_id,
+        _jamo=_sorted_keys((to_jamo(n), pos) for pos, n in enumerate(names)),
+        _choseong=_sorted_keys((to_choseong(n), pos) for pos, n in enumerate(names)),
+        _ids=_sorted_keys((i.lower(), pos) for pos, i in enumerate(ids)),
+    )
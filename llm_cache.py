@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# --- LLM 결과 캐시 설정 ---
+# 모델명 + 프롬프트 원문이 같으면 임원 전환/앱 재시작/다른 코치 세션에서도 저장된 결과를 바로 반환합니다.
+CACHE_PATH = os.environ.get("COACH_LLM_CACHE", os.path.join(".cache", "llm_cache.sqlite3"))
+CACHE_TTL_SECONDS = float(os.environ.get("COACH_LLM_CACHE_TTL_DAYS", "30")) * 24 * 3600
+CACHE_MAX_ENTRIES = int(os.environ.get("COACH_LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def cache_key(model, prompt):
+    return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite 기반 LLM 결과 캐시입니다. (TTL 만료 + 최근 사용 기준 LRU 정리)
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_results (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_results_accessed ON llm_results (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, model, prompt):
+        key = cache_key(model, prompt)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM llm_results WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_results WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute(
+                    "UPDATE llm_results SET accessed_at = ?, hit_count = hit_count + 1 WHERE key = ?", (now, key)
+                )
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def peek(self, model, prompt):
+        # 적중률/최근 사용 시각을 건드리지 않는 읽기 전용 조회 (미리 생성/내보내기용)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_results WHERE key = ? AND created_at >= ?",
+                (cache_key(model, prompt), time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def contains(self, model, prompt):
+        return self.peek(model, prompt) is not None
+
+    def put(self, model, prompt, response):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_results (key, model, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (cache_key(model, prompt), model, response, now, now),
+            )
+            conn.execute("DELETE FROM llm_results WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                """
+                DELETE FROM llm_results WHERE key IN (
+                    SELECT key FROM llm_results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, total_hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM llm_results").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "total_hits": total_hits,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    # 프로세스 전체에서 하나의 캐시 객체를 공유
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_stream(model, prompt, stream, force=False):
+    """
+    캐시에 결과가 있으면 그 결과를 한 번에 내보내고, 없거나 force=True(재실행)이면 stream()의 텍스트 조각을 그대로 내보냅니다.
+    끝까지 받은 경우에만 캐시에 저장합니다. (중간에 닫히면 저장하지 않음)
+    """
+    cache = get_cache()
+    if not force:
+        cached = cache.get(model, prompt)
+        if cached is not None:
+            yield cached
+            return
+    chunks = []
+    for chunk in stream():
+        chunks.append(chunk)
+        yield chunk
+    response = "".join(chunks)
+    if response:
+        cache.put(model, prompt, response)
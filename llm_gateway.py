@@ -0,0 +1,137 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import openai
+
+from prompts import MODEL
+from telemetry import record_llm
+
+# --- LLM 게이트웨이 설정 ---
+# 프로세스 전체가 하나의 커넥션 풀(keep-alive/TLS 재사용)을 공유하고, 동시 요청 수를 제한합니다.
+MAX_IN_FLIGHT = int(os.environ.get("COACH_LLM_MAX_IN_FLIGHT", "8"))
+MAX_RETRIES = int(os.environ.get("COACH_LLM_MAX_RETRIES", "3"))
+REQUEST_TIMEOUT = float(os.environ.get("COACH_LLM_TIMEOUT", "120"))
+CONNECT_TIMEOUT = 10.0
+METRICS_HISTORY = 500
+
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError, openai.InternalServerError)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    # 지수 백오프 + full jitter
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LLMGateway:
+    """
+    요약/심층 분석/코칭 대화가 함께 쓰는 LLM 호출 창구입니다.
+    - 공유 커넥션 풀 + 호출별 타임아웃
+    - 재시도(지수 백오프 + jitter), 스트리밍은 첫 토큰 전까지만 재시도
+    - 프로세스 전체 동시 요청 수 제한
+    - 호출별 지연시간/첫 토큰 시간(TTFT)/토큰 수 기록
+    """
+
+    def __init__(self, api_key, base_url=None, max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT):
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        # 클라이언트 하나를 계속 재사용해야 내부 커넥션 풀(keep-alive/TLS 세션)이 유지됨
+        self.client = openai.OpenAI(
+            api_key=api_key, base_url=base_url, timeout=openai.Timeout(timeout, connect=CONNECT_TIMEOUT), max_retries=0
+        )
+        self._metrics = deque(maxlen=METRICS_HISTORY)
+        self._metrics_lock = threading.Lock()
+
+    def _record(self, **metric):
+        with self._metrics_lock:
+            self._metrics.append(metric)
+        record_llm(metric)
+
+    def metrics(self):
+        with self._metrics_lock:
+            return list(self._metrics)
+
+    def _create(self, messages, model, timeout, first_attempt=0, **kwargs):
+        # 응답(스트리밍이면 스트림 객체)을 받을 때까지 재시도, 반환값의 시도 횟수는 first_attempt부터 센 누적값
+        for attempt in range(first_attempt, self.max_retries + 1):
+            try:
+                return self.client.chat.completions.create(
+                    model=model, messages=messages, timeout=timeout or self.timeout, **kwargs
+                ), attempt + 1
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+
+    def complete(self, messages, model=MODEL, timeout=None, kind="complete"):
+        started = time.perf_counter()
+        attempts, usage, ok = 0, None, False
+        with self._slots:
+            try:
+                res, attempts = self._create(messages, model, timeout)
+                usage = res.usage
+                ok = True
+                return res.choices[0].message.content
+            finally:
+                latency = time.perf_counter() - started
+                self._record(
+                    kind=kind, model=model, ok=ok, attempts=attempts, latency=latency, ttft=latency if ok else None,
+                    prompt_tokens=getattr(usage, "prompt_tokens", None),
+                    completion_tokens=getattr(usage, "completion_tokens", None),
+                )
+
+    def stream(self, messages, model=MODEL, timeout=None, kind="stream"):
+        """
+        응답 텍스트 조각을 순서대로 내보내는 제너레이터입니다. (st.write_stream에 그대로 전달 가능)
+        첫 텍스트 조각을 받기 전에 연결이 끊기거나 서버 오류가 나면 재시도 횟수 안에서 다시 요청합니다.
+        (이미 내보낸 조각은 되돌릴 수 없으므로 그 이후의 오류는 그대로 전달)
+        중간에 닫히면(close) 연결도 함께 정리합니다.
+        """
+        started = time.perf_counter()
+        attempts, usage, ttft, ok = 0, None, None, False
+        with self._slots:
+            try:
+                while True:
+                    stream, attempts = self._create(
+                        messages, model, timeout, first_attempt=attempts, stream=True, stream_options={"include_usage": True}
+                    )
+                    try:
+                        with stream:
+                            for chunk in stream:
+                                if chunk.usage is not None:
+                                    usage = chunk.usage
+                                if not chunk.choices:
+                                    continue
+                                text = chunk.choices[0].delta.content
+                                if text:
+                                    if ttft is None:
+                                        ttft = time.perf_counter() - started
+                                    yield text
+                        break
+                    except RETRYABLE_ERRORS:
+                        if ttft is not None or attempts > self.max_retries:
+                            raise
+                        time.sleep(backoff_delay(attempts - 1))
+                ok = True
+            finally:
+                self._record(
+                    kind=kind, model=model, ok=ok, attempts=attempts, latency=time.perf_counter() - started, ttft=ttft,
+                    prompt_tokens=getattr(usage, "prompt_tokens", None),
+                    completion_tokens=getattr(usage, "completion_tokens", None),
+                )
+
+
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(api_key, base_url=None):
+    # API Key(+주소)별로 프로세스 전체에서 하나의 게이트웨이를 공유
+    key = (api_key, base_url)
+    with _gateways_lock:
+        if key not in _gateways:
+            _gateways[key] = LLMGateway(api_key, base_url=base_url)
+        return _gateways[key]
@@ -0,0 +1,129 @@
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+OVERALL = "종합"
+QUARTILES = (0.25, 0.5, 0.75)
+MAX_PEER_GROUPS = 50  # 비교 집단으로 쓸 수 있는 메타 컬럼의 최대 고유값 수
+
+
+def quartile_band(percentile):
+    # 백분위(0~100, 높을수록 우수) → 4분위 구간 이름
+    if np.isnan(percentile):
+        return "-"
+    if percentile >= 75:
+        return "상위 25%"
+    if percentile >= 50:
+        return "상위 50%"
+    if percentile >= 25:
+        return "하위 50%"
+    return "하위 25%"
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    한 집단(전체 또는 특정 부문 등)의 점수 분포입니다.
+    열(종류, 연도, 항목)마다 응답이 있는 점수만 오름차순으로 정렬해 두고, 순위는 이진 탐색으로 구합니다.
+    """
+    sorted_values: np.ndarray  # (임원 수, 열 수) 열별 오름차순, 무응답(NaN)은 뒤쪽
+    counts: np.ndarray  # 열별 응답 수
+    quartiles: np.ndarray  # (3, 열 수) 1사분위/중앙값/3사분위
+
+    def percentiles(self, values):
+        # 같은 점수는 절반만 아래로 세는 중간 순위 방식 (0~100)
+        result = np.full(len(values), np.nan)
+        for col, value in enumerate(values):
+            count = self.counts[col]
+            if count == 0 or not value > 0:
+                continue
+            column = self.sorted_values[:count, col]
+            below = np.searchsorted(column, value, side="left")
+            equal = np.searchsorted(column, value, side="right") - below
+            result[col] = (below + equal / 2) / count * 100
+        return result
+
+
+def build_distribution(values):
+    sorted_values = np.sort(values, axis=0)  # NaN은 맨 뒤로 정렬됨
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+    quartiles = np.full((len(QUARTILES), values.shape[1]), np.nan)
+    for col in np.flatnonzero(counts):
+        quartiles[:, col] = np.quantile(sorted_values[:counts[col], col], QUARTILES)
+    return Distribution(sorted_values=sorted_values, counts=counts, quartiles=quartiles)
+
+
+@dataclass(frozen=True)
+class CohortIndex:
+    """
+    전체 임원의 연도별 종합/역량그룹/세부역량 점수 분포 색인입니다. (로드 시 한 번 생성)
+    임원별 점수 조회(scoring.leader_scores)도 이 values를 그대로 읽으므로, 넓은 점수 테이블은 따로 두지 않습니다.
+    비교 집단(부문 등 메타 컬럼)별 분포는 처음 요청될 때 한 번 만들어 재사용합니다.
+    """
+    years: list  # 구성원 점수가 있는 연도 (오름차순)
+    columns: pd.MultiIndex  # (종류: overall/grouped/detailed, 연도, 항목)
+    values: np.ndarray  # (임원 수, 열 수), 무응답은 NaN
+    meta: pd.DataFrame
+    cohort: Distribution
+    _peer_groups: dict = field(default_factory=dict, repr=False)
+    _lock: object = field(default_factory=threading.Lock, repr=False)
+
+    def peer_fields(self, exclude=()):
+        # 비교 집단으로 쓸 만한 메타 컬럼 (고유값이 2개 이상, MAX_PEER_GROUPS 이하)
+        fields = []
+        for col in self.meta.columns:
+            if col in exclude:
+                continue
+            unique = self.meta[col].nunique(dropna=False)
+            if 1 < unique <= MAX_PEER_GROUPS:
+                fields.append(col)
+        return fields
+
+    def _groups(self, field_name):
+        with self._lock:
+            groups = self._peer_groups.get(field_name)
+            if groups is None:
+                codes, labels = pd.factorize(self.meta[field_name].astype(str))
+                groups = (codes, labels, [build_distribution(self.values[codes == g]) for g in range(len(labels))])
+                self._peer_groups[field_name] = groups
+            return groups
+
+    def standing(self, row, field_name=None):
+        """
+        한 임원의 열별 점수/백분위/4분위 구간/분포 사분위를 DataFrame으로 반환합니다.
+        field_name을 주면 같은 값(예: 같은 부문)을 가진 임원들만의 분포와 비교합니다.
+        """
+        distribution, group = self.cohort, "전체"
+        if field_name:
+            codes, labels, distributions = self._groups(field_name)
+            distribution, group = distributions[codes[row]], labels[codes[row]]
+
+        values = self.values[row]
+        percentiles = distribution.percentiles(values)
+        return pd.DataFrame({
+            "score": values,
+            "percentile": percentiles,
+            "band": [quartile_band(p) for p in percentiles],
+            "q1": distribution.quartiles[0],
+            "median": distribution.quartiles[1],
+            "q3": distribution.quartiles[2],
+            "n": distribution.counts,
+        }, index=self.columns).assign(group=group)
+
+
+def build_cohort_index(tables, meta):
+    """
+    점수 테이블(scoring.ScoreTables)로 분포 색인을 만듭니다. 0점(무응답)은 분포에서 제외합니다.
+    """
+    overall = tables.overall.set_axis(pd.MultiIndex.from_product([tables.overall.columns, [OVERALL]]), axis=1)
+    frames = {"overall": overall, "grouped": tables.grouped, "detailed": tables.detailed}
+    frames = {kind: frame for kind, frame in frames.items() if len(frame.columns)}
+    if frames:
+        combined = pd.concat(frames, axis=1)
+        columns, values = combined.columns, combined.to_numpy(dtype="float64")
+    else:
+        columns, values = pd.MultiIndex.from_tuples([], names=[None] * 3), np.empty((len(meta), 0))
+    values = np.where(values > 0, values, np.nan)
+    return CohortIndex(years=list(tables.years), columns=columns, values=values, meta=meta, cohort=build_distribution(values))
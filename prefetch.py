@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import cache_key, get_cache
+from llm_gateway import get_gateway
+from prompts import MODEL
+
+# --- AI 결과 미리 생성(prefetch) 설정 ---
+# 임원을 선택하는 즉시 요약/심층 분석을 백그라운드에서 생성해 결과 캐시(llm_cache)에 채워 둡니다.
+PREFETCH_WORKERS = int(os.environ.get("COACH_PREFETCH_WORKERS", "4"))
+PREFETCH_AHEAD = int(os.environ.get("COACH_PREFETCH_AHEAD", "3"))  # 선택 목록에서 미리 생성할 다음 임원 수
+SESSION_TTL_SECONDS = float(os.environ.get("COACH_PREFETCH_SESSION_TTL", "60"))  # 이 시간 동안 소식이 없는 세션(닫힌 탭)의 작업은 취소
+PREFETCH_WAIT_SECONDS = float(os.environ.get("COACH_PREFETCH_WAIT", "30"))  # 화면에서 미리 생성 결과를 기다리는 최대 시간
+PRUNE_INTERVAL_SECONDS = 5
+
+
+class Prefetcher:
+    """
+    세션(코치)별로 "지금 필요한 프롬프트" 목록을 받아, 캐시에 없는 것만 작업 풀에서 생성합니다.
+    - 같은 프롬프트는 여러 세션이 원해도 한 번만 생성
+    - 어느 세션도 더 이상 원하지 않는 작업은 취소 (대기 중이면 실행 안 함, 생성 중이면 스트림을 닫아 중단)
+    - 세션은 update/touch로 살아 있음을 알리고, SESSION_TTL_SECONDS 동안 소식이 없으면(탭 닫힘 등) 만료
+    """
+
+    def __init__(self, api_key, max_workers=PREFETCH_WORKERS):
+        self.gateway = get_gateway(api_key)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._jobs = {}  # 캐시 키 -> (Future, 취소 Event)
+        self._wanted = {}  # 세션 ID -> 캐시 키 집합
+        self._seen = {}  # 세션 ID -> 마지막 update/touch 시각
+        self._pruned_at = 0.0
+
+    def _cancel_unwanted(self):
+        # (lock 안에서 호출) 만료된 세션을 지우고, 남은 세션 누구도 원하지 않는 작업을 취소
+        now = time.monotonic()
+        self._pruned_at = now
+        for session_id in [s for s, seen in self._seen.items() if now - seen > SESSION_TTL_SECONDS]:
+            del self._seen[session_id]
+            self._wanted.pop(session_id, None)
+        wanted = set().union(*self._wanted.values())
+        for key in [k for k in self._jobs if k not in wanted]:
+            future, cancel = self._jobs.pop(key)
+            cancel.set()
+            future.cancel()
+        return wanted
+
+    def _prune(self):
+        # 작업 실행 중에도 주기적으로 만료 세션 정리 (모든 탭이 닫혀 update가 더 오지 않는 경우 대비)
+        with self._lock:
+            if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+                self._cancel_unwanted()
+
+    def _generate(self, key, prompt, kind, cancel):
+        self._prune()
+        if cancel.is_set():
+            return None
+        stream = self.gateway.stream([{"role": "user", "content": prompt}], kind=f"prefetch_{kind}")
+        chunks = []
+        try:
+            for chunk in stream:
+                self._prune()
+                if cancel.is_set():
+                    return None
+                chunks.append(chunk)
+            # 캐시에 저장한 뒤에 작업 목록에서 빼야, 화면에서 "완료"를 본 시점에 항상 캐시 적중
+            text = "".join(chunks)
+            if text:
+                get_cache().put(MODEL, prompt, text)
+            return text
+        finally:
+            stream.close()
+            with self._lock:
+                if self._jobs.get(key, (None, None))[1] is cancel:
+                    del self._jobs[key]
+
+    def update(self, session_id, jobs):
+        """
+        session_id가 지금 필요로 하는 (종류, 프롬프트) 목록을 우선순위 순서로 알려줍니다. 빈 목록이면 해당 세션 작업을 모두 포기합니다.
+        """
+        cache = get_cache()
+        keys = [cache_key(MODEL, prompt) for _, prompt in jobs]
+        with self._lock:
+            self._wanted[session_id] = set(keys)
+            self._seen[session_id] = time.monotonic()
+            self._cancel_unwanted()
+            pending = [(key, kind, prompt) for key, (kind, prompt) in zip(keys, jobs) if key not in self._jobs]
+
+        for key, kind, prompt in pending:
+            if cache.contains(MODEL, prompt):
+                continue
+            cancel = threading.Event()
+            with self._lock:
+                if key in self._jobs or key not in set().union(*self._wanted.values()):
+                    continue
+                self._jobs[key] = (self._executor.submit(self._generate, key, prompt, kind, cancel), cancel)
+
+    def touch(self, session_id):
+        # 세션이 아직 열려 있음을 알림 (화면의 주기적 확인에서 호출)
+        with self._lock:
+            if session_id in self._seen:
+                self._seen[session_id] = time.monotonic()
+            if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+                self._cancel_unwanted()
+
+    def pending(self, prompt):
+        # 생성 중(또는 대기 중)인 작업의 Future (없으면 None)
+        with self._lock:
+            job = self._jobs.get(cache_key(MODEL, prompt))
+        return job[0] if job else None
+
+    def wait(self, prompt, timeout=PREFETCH_WAIT_SECONDS):
+        """
+        진행 중인 미리 생성 작업이 있으면 끝날 때까지(최대 timeout초) 기다려 결과를 반환합니다. (없거나 취소/실패/시간 초과면 None)
+        """
+        future = self.pending(prompt)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+
+_prefetchers = {}
+_prefetchers_lock = threading.Lock()
+
+
+def get_prefetcher(api_key):
+    # API Key별로 프로세스 전체에서 하나의 작업 풀을 공유
+    with _prefetchers_lock:
+        if api_key not in _prefetchers:
+            _prefetchers[api_key] = Prefetcher(api_key)
+        return _prefetchers[api_key]
@@ -0,0 +1,92 @@
+from textwrap import dedent
+
+from dedup import collapse
+from keywords import format_keyword_table, leader_keywords
+from scoring import leader_scores, strongest_weakest
+from store import MEMBER
+
+MODEL = "gpt-5-mini"
+
+
+def build_summary_prompt(latest_year, latest_texts):
+    return dedent(f"""
+        다음은 특정 임원의 {latest_year}년도 다면평가 주관식 피드백 원문입니다.
+        대시보드에서 한눈에 볼 수 있도록 다음 3가지 항목으로 아주 간결하게(각 1줄씩) 요약해주세요.
+        1. 주요 강점:
+        2. 주요 보완점:
+        3. 종합 제언:
+
+        [피드백 원문] (×N: 같은 취지의 코멘트가 N번 반복됨)
+        """) + latest_texts
+
+
+def build_analysis_prompt(data_context):
+    return dedent("""
+        당신은 대기업 임원 리더십 평가 전문가입니다.
+        제공된 3년치 '객관식 점수'와 '주관식 코멘트 키워드 집계(구성원/동료)'를 통합 분석하여 아래 3가지 항목으로 심층 리포트를 작성해주세요.
+
+        1. **3개년 주관식 키워드 주요 변화**
+           - 연도별로 주관식에서 자주 등장하는 긍정/부정 키워드가 어떻게 달라졌는지 분석하세요.
+           - 예: "22년에는 '추진력'이 강조되었으나, 24년에는 '소통 부재'가 키워드로 부상함"
+
+        2. **변화 원인 추적 (정량+정성 통합)**
+           - 객관식 점수의 상승/하락 원인을 주관식 키워드 변화에서 찾아 연결하세요.
+           - 예: "전략적 Insight 점수가 하락한 원인은, 구성원 코멘트에서 '구체적 비전 공유 부족'이 반복 언급된 것과 연관됨"
+
+        3. **구성원 vs 동료 인식 비교**
+           - 동일한 리더십에 대해 구성원과 동료 임원이 바라보는 시각 차이(Gap)를 분석하세요.
+           - 예: "동료들은 '협업 능력'을 높게 평가하나, 구성원들은 '팀 내 소통'을 아쉬워하는 경향이 있음"
+
+        [분석 대상 데이터]
+        """) + data_context
+
+
+# --- 프롬프트 입력 데이터 구성 (앱/배치 공용) ---
+def collect_latest_feedback(store, row, latest_year):
+    """
+    최근 연도 주관식 코멘트를 요약 프롬프트용 텍스트와 화면 미리보기 목록으로 만듭니다.
+    프롬프트에는 거의 같은 코멘트를 대표 1건 + 반복 횟수(×N)로 묶어 넣고, 미리보기는 원문 그대로 둡니다.
+    """
+    latest_texts = ""
+    raw_preview = []
+    latest_comments = store.comments_for(row=row, year=latest_year)
+    for rater, val in zip(latest_comments["rater"], latest_comments["text"]):
+        icon = "👤" if rater == MEMBER else "🤝"
+        raw_preview.append(f"{icon} **{rater}:** {val}")
+    for raters, val, count in collapse(latest_comments)[["raters", "text", "count"]].itertuples(index=False):
+        latest_texts += f"- [{raters}] {val}" + (f" ×{count}" if count > 1 else "") + "\n"
+    return latest_texts, raw_preview
+
+
+def build_data_context(keyword_table, avg_scores, latest_year, top_comp, bot_comp):
+    """
+    심층 분석 프롬프트에 들어가는 주관식 키워드 집계 + 점수 추이 텍스트를 만듭니다.
+    원문 코멘트 대신 로컬에서 집계한 키워드 표만 보내 입력 토큰을 줄입니다.
+    """
+    data_context = ""
+
+    data_context += "### [1] 주관식 키워드 집계 (구성원/동료, 3개년)\n"
+    data_context += keyword_table
+
+    data_context += "\n### [2] 객관식 점수 변화 추이\n"
+    data_context += f"- 종합 점수 변화: {avg_scores}\n"
+    data_context += f"- {latest_year}년 최고 강점: {top_comp}, 보완 필요: {bot_comp}\n"
+    return data_context
+
+
+def leader_prompts(dataset, row):
+    """
+    대시보드와 동일한 방식으로 한 임원의 요약/심층 분석 프롬프트를 만듭니다. (주관식이 없으면 요약은 None)
+    """
+    sorted_years = dataset.years
+    latest_year = sorted_years[-1]
+    detailed_scores, _, avg_scores = leader_scores(dataset.cohort, row)
+    _, top_comp, bot_comp = strongest_weakest(detailed_scores[latest_year])
+
+    latest_texts, _ = collect_latest_feedback(dataset.store, row, latest_year)
+    keyword_table = format_keyword_table(leader_keywords(dataset.keywords, row, sorted_years))
+    data_context = build_data_context(keyword_table, avg_scores, latest_year, top_comp, bot_comp)
+    return {
+        "summary": build_summary_prompt(latest_year, latest_texts) if latest_texts.strip() else None,
+        "analysis": build_analysis_prompt(data_context),
+    }
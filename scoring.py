@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from store import MEMBER
+from survey import normalize_text
+
+
+@dataclass(frozen=True)
+class ScoreTables:
+    """
+    전체 임원 x 연도의 점수 테이블 묶음입니다. (행 = 원본 데이터의 행 위치)
+    - detailed: (연도, 세부역량) 컬럼의 세부 점수 (결측/0 이하는 0)
+    - grouped: (연도, 역량그룹) 컬럼의 그룹 평균 점수
+    - overall: 연도 컬럼의 종합 점수
+    """
+    years: list
+    detailed: pd.DataFrame
+    grouped: pd.DataFrame
+    overall: pd.DataFrame
+
+
+def resolve_competencies(year_comps, competency_groups):
+    """
+    역량그룹 항목이 연도별로 가리키는 세부역량명을 한 번만 계산합니다. (year_comps: 연도 -> 세부역량 목록)
+    항목명이 그대로 없으면 최근 연도 역량명을 정규화(normalize_text)한 값으로 찾습니다.
+    """
+    sorted_years = sorted(year_comps.keys())
+    norm_comp_map = {normalize_text(c): c for c in year_comps[sorted_years[-1]]}
+    norm_items = {item: normalize_text(item) for items in competency_groups.values() for item in items}
+
+    resolved = {}
+    for year in sorted_years:
+        comps = set(year_comps[year])
+        group_comps = {}
+        for group_name, sub_items in competency_groups.items():
+            targets = []
+            for item in sub_items:
+                norm_item = norm_items[item]
+                if item in comps:
+                    targets.append(item)
+                elif norm_item in norm_comp_map and norm_comp_map[norm_item] in comps:
+                    targets.append(norm_comp_map[norm_item])
+            group_comps[group_name] = targets
+        resolved[year] = group_comps
+    return resolved
+
+
+def _empty_tables(n):
+    empty = pd.DataFrame(index=pd.RangeIndex(n))
+    return ScoreTables(years=[], detailed=empty, grouped=empty, overall=empty)
+
+
+def _positive_mean(values):
+    # 0보다 큰 값만 평균 (없으면 0)
+    counts = (values > 0).sum(axis=1)
+    sums = values.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), 0.0)
+
+
+def compute_score_tables(scores, n, competency_groups):
+    """
+    long-format 저장소의 구성원 점수(store.scores)로 전체 임원의 세부/그룹/종합 점수를 연도별 배열 연산 한 번으로 계산합니다.
+    컬럼명을 다시 해석하지 않고 (row, 연도, 역량) 키로 바로 채웁니다. (n: 전체 임원 수)
+    """
+    member = scores[(scores["rater"] == MEMBER).to_numpy()]
+    if member.empty:
+        # 동료 응답만 있는 파일 등 구성원 점수가 없는 경우
+        return _empty_tables(n)
+    categories = member["competency"].cat.categories
+    blocks = {}
+    for year, block in member.groupby("year", observed=True, sort=True):
+        # 역량 순서는 저장소의 categories 순서(원본 컬럼 순서)를 따름
+        codes = block["competency"].cat.codes.to_numpy()
+        present = np.unique(codes)
+        values = np.zeros((n, len(present)))
+        # float32 저장 오차를 소수 6자리 반올림으로 되돌림 (원본 점수의 소수 자릿수 이내)
+        values[block["row"].to_numpy(), np.searchsorted(present, codes)] = np.round(block["score"].to_numpy(dtype="float64"), 6)
+        blocks[year] = (list(categories[present]), np.where(values > 0, values, 0.0))
+    sorted_years = list(blocks)
+    resolved = resolve_competencies({y: comps for y, (comps, _) in blocks.items()}, competency_groups)
+
+    detailed_parts, grouped_parts, overall_parts = {}, {}, {}
+    for year in sorted_years:
+        comps, values = blocks[year]
+        detailed_parts[year] = pd.DataFrame(values, columns=comps)
+        overall_parts[year] = _positive_mean(values)
+
+        comp_pos = {c: i for i, c in enumerate(comps)}
+        grouped_parts[year] = pd.DataFrame({
+            group_name: _positive_mean(values[:, [comp_pos[c] for c in targets]])
+            for group_name, targets in resolved[year].items()
+        }, index=pd.RangeIndex(n))
+
+    return ScoreTables(
+        years=sorted_years,
+        detailed=pd.concat(detailed_parts, axis=1),
+        grouped=pd.concat(grouped_parts, axis=1),
+        overall=pd.DataFrame(overall_parts),
+    )
+
+
+def leader_scores(cohort, row):
+    """
+    특정 임원(행 위치)의 점수를 기존 dict 형태(detailed/grouped/avg)로 꺼냅니다.
+    점수 테이블은 분포 색인(percentiles.CohortIndex)에 한 벌만 두므로 그 행을 읽고, 무응답(NaN)은 0으로 돌려줍니다.
+    """
+    tables = {"detailed": {y: {} for y in cohort.years}, "grouped": {y: {} for y in cohort.years}, "overall": {}}
+    for (kind, year, item), value in zip(cohort.columns, np.nan_to_num(cohort.values[row], nan=0.0).tolist()):
+        if kind == "overall":
+            tables["overall"][year] = value
+        else:
+            tables[kind][year][item] = value
+    return tables["detailed"], tables["grouped"], tables["overall"]
+
+
+def strongest_weakest(year_scores):
+    """
+    한 연도의 세부역량 점수(dict)에서 응답이 있는 역량만 남기고 최고 강점/보완 필요 역량을 찾습니다.
+    """
+    latest_series = pd.Series(year_scores, dtype="float64")
+    latest_series = latest_series[latest_series > 0]
+    if latest_series.empty:
+        return latest_series, "-", "-"
+    return latest_series, latest_series.idxmax(), latest_series.idxmin()
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+MEMBER = "구성원"
+PEER = "동료"
+RATERS = [MEMBER, PEER]
+EMPTY_TEXTS = ["0", "-", ""]
+
+
+@dataclass(frozen=True)
+class SurveyStore:
+    """
+    로드 시 한 번 만들어 두는 long-format 저장소입니다.
+    - scores: row(임원 행 위치) / year / rater / competency / score(float32)
+    - comments: row / year / rater / item / text (빈 응답은 제외)
+    두 테이블 모두 row 기준으로 정렬되어 있어 임원별 조회는 이진 탐색으로 끝납니다.
+    """
+    scores: pd.DataFrame
+    comments: pd.DataFrame
+
+    @staticmethod
+    def _slice(table, row):
+        rows = table["row"].to_numpy()
+        start, stop = np.searchsorted(rows, [row, row + 1])
+        return table.iloc[start:stop]
+
+    @staticmethod
+    def _filter(table, year=None, rater=None):
+        mask = np.ones(len(table), dtype=bool)
+        if year is not None:
+            mask &= (table["year"] == year).to_numpy()
+        if rater is not None:
+            mask &= (table["rater"] == rater).to_numpy()
+        return table[mask]
+
+    def scores_for(self, row=None, year=None, rater=None):
+        table = self.scores if row is None else self._slice(self.scores, row)
+        return self._filter(table, year, rater)
+
+    def comments_for(self, row=None, year=None, rater=None):
+        table = self.comments if row is None else self._slice(self.comments, row)
+        return self._filter(table, year, rater)
+
+
+def _blocks(col_map, rater):
+    for year, cols in col_map.items():
+        suffix = f"_동료_{year}" if rater == PEER else f"_{year}"
+        yield year, rater, cols, [c.replace(suffix, "") for c in cols]
+
+
+def _categorical(values, categories):
+    return pd.Categorical(values, categories=categories)
+
+
+def build_store(df, columns):
+    """
+    넓은(wide) 원본 프레임과 parse_columns 결과로 long-format 저장소를 만듭니다.
+    """
+    _, member_scores, peer_scores, member_texts, peer_texts = columns
+    n = len(df)
+    years = sorted(set(member_scores) | set(peer_scores) | set(member_texts) | set(peer_texts))
+    row_ids = np.arange(n, dtype=np.int32)
+
+    score_parts, competencies = [], {}
+    for year, rater, cols, items in [*_blocks(member_scores, MEMBER), *_blocks(peer_scores, PEER)]:
+        competencies.update(dict.fromkeys(items))
+        values = df[cols].to_numpy(dtype="float32", na_value=np.nan)
+        keep = ~np.isnan(values)
+        rows, pos = np.nonzero(keep)
+        score_parts.append(pd.DataFrame({
+            "row": row_ids[rows],
+            "year": year,
+            "rater": rater,
+            "competency": np.asarray(items, dtype=object)[pos],
+            "score": values[keep],
+        }))
+
+    comment_parts = []
+    for year, rater, cols, items in [*_blocks(member_texts, MEMBER), *_blocks(peer_texts, PEER)]:
+        block = df[cols].astype("string")
+        stripped = block.apply(lambda s: s.str.strip())
+        keep = (stripped.notna() & ~stripped.isin(EMPTY_TEXTS)).to_numpy(dtype=bool)
+        values = block.to_numpy(dtype=object)
+        rows, pos = np.nonzero(keep)
+        comment_parts.append(pd.DataFrame({
+            "row": row_ids[rows],
+            "year": year,
+            "rater": rater,
+            "item": np.asarray(items, dtype=object)[pos],
+            "text": values[keep],
+            "order": pos.astype(np.int16),
+        }))
+
+    scores = _concat(score_parts, ["row", "year", "rater", "competency", "score"])
+    comments = _concat(comment_parts, ["row", "year", "rater", "item", "text", "order"])
+    return _finalize(scores, comments, years, list(competencies))
+
+
+def _finalize(scores, comments, years, competencies):
+    # 역량 categories는 원본 컬럼 순서를 유지 (점수 테이블의 세부역량 순서가 됨)
+    scores = scores.assign(
+        year=_categorical(scores["year"], years),
+        rater=_categorical(scores["rater"], RATERS),
+        competency=_categorical(scores["competency"], competencies),
+        score=scores["score"].astype("float32"),
+    ).sort_values(["row", "rater", "year"], kind="stable").reset_index(drop=True)
+
+    # 원본 컬럼 순서(order)를 유지해 프롬프트 구성 결과가 기존과 같도록 정렬
+    comments = comments.assign(
+        year=_categorical(comments["year"], years),
+        rater=_categorical(comments["rater"], RATERS),
+        item=comments["item"].astype("category"),
+        text=comments["text"].astype("string"),
+    ).sort_values(["row", "rater", "year", "order"], kind="stable").reset_index(drop=True)
+
+    return SurveyStore(scores=scores, comments=comments)
+
+
+def _latest_only(tables):
+    # (임원, 연도, 평가자) 단위로 가장 최신 파일(part)의 데이터만 남김
+    table = pd.concat(tables, ignore_index=True)
+    if table.empty:
+        return table.drop(columns="part")
+    key = [table["row"], table["year"].astype(str), table["rater"].astype(str)]
+    newest = table["part"].groupby(key).transform("max")
+    return table[table["part"] == newest].drop(columns="part")
+
+
+def merge_stores(parts):
+    """
+    파일(파티션)별 저장소를 전체 임원 기준으로 합칩니다.
+    parts는 (SurveyStore, 전체 행 위치 배열) 목록이며, 같은 임원/연도/평가자 데이터는 최신 파일이 우선합니다.
+    파일별로 붙여 둔 유사 코멘트 묶음 번호(cluster)는 파일끼리 겹치지 않게 앞 파일들의 코멘트 수만큼 밀어 둡니다.
+    """
+    scores, comments, offset = [], [], 0
+    # 역량 순서는 최신 파일 기준 (뒤 파일에만 있는 역량이 앞에 옴)
+    competencies = list(dict.fromkeys(c for store, _ in reversed(parts) for c in store.scores["competency"].cat.categories))
+    for part, (store, row_map) in enumerate(parts):
+        scores.append(store.scores.astype({"year": str, "rater": str, "competency": str})
+                      .assign(row=row_map[store.scores["row"].to_numpy()].astype(np.int32), part=part))
+        extra = {"cluster": store.comments["cluster"] + offset} if "cluster" in store.comments else {}
+        comments.append(store.comments.astype({"year": str, "rater": str, "item": str})
+                        .assign(row=row_map[store.comments["row"].to_numpy()].astype(np.int32), part=part, **extra))
+        offset += len(store.comments)
+
+    scores, comments = _latest_only(scores), _latest_only(comments)
+    years = sorted(set(scores["year"]) | set(comments["year"]))
+    return _finalize(scores, comments, years, competencies)
+
+
+def _concat(parts, columns):
+    if not parts:
+        return pd.DataFrame({c: pd.Series(dtype=object) for c in columns}).astype({"row": np.int32})
+    return pd.concat(parts, ignore_index=True)
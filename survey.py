@@ -0,0 +1,64 @@
+import re
+
+import pandas as pd
+
+# --- 역량 그룹 정의 ---
+COMPETENCY_GROUPS = {
+    "SKMS에 대한 확신과 열정": ["SKMS에 대한 확신", "구성원/이해관계자 행복 추구", "패기/솔선수범", "Integrity"],
+    "혁신적 전략 수립": ["전략적 Insight", "담당 조직 변화 Design", "비전 공유/지속적 변화 추진"],
+    "과감한 돌파와 실행": ["SUPEX 목표 설정", "내·외부 폭넓은 협업", "신속한 실행 및 성과 창출"],
+    "VWBE 문화구축": ["구성원 VWBE환경 조성 활동 지원", "신뢰 기반의 협력 촉진", "패기 인재 인정/육성"]
+}
+
+PEER_PATTERN = re.compile(r"^(.*)_동료_(\d{2}년)$")
+MEMBER_PATTERN = re.compile(r"^(.*)_(\d{2}년)$")
+
+
+def normalize_text(text):
+    return re.sub(r'[\s\·\.\,\-\_]', '', str(text)).lower()
+
+
+def find_name_column(df):
+    return next((c for c in df.columns if "이름" in c or "Name" in c), df.columns[1])
+
+
+def find_id_column(columns):
+    return next((c for c in columns if "사번" in c or "ID" in c), None)
+
+
+def parse_columns(df):
+    """
+    컬럼명을 분석하여 점수(Numeric)와 주관식(Text)을 구분하고,
+    대상(구성원/동료)과 연도를 분류합니다.
+    """
+    member_scores = {}
+    peer_scores = {}
+    member_texts = {}  # 구성원 주관식
+    peer_texts = {}    # 동료 주관식
+    meta_cols = []
+
+    for col in df.columns:
+        peer_match = PEER_PATTERN.match(col)
+        if peer_match:
+            year = peer_match.group(2)
+            if pd.api.types.is_numeric_dtype(df[col]):
+                if year not in peer_scores: peer_scores[year] = []
+                peer_scores[year].append(col)
+            else:
+                if year not in peer_texts: peer_texts[year] = []
+                peer_texts[year].append(col)
+            continue
+
+        member_match = MEMBER_PATTERN.match(col)
+        if member_match:
+            year = member_match.group(2)
+            if pd.api.types.is_numeric_dtype(df[col]):
+                if year not in member_scores: member_scores[year] = []
+                member_scores[year].append(col)
+            else:
+                if year not in member_texts: member_texts[year] = []
+                member_texts[year].append(col)
+        else:
+            meta_cols.append(col)
+
+    return meta_cols, member_scores, peer_scores, member_texts, peer_texts
@@ -0,0 +1,239 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+# --- 구간별 소요 시간 계측 설정 ---
+# COACH_TELEMETRY=1 일 때만 기록합니다. 꺼져 있으면 span()은 아무 일도 하지 않는 공용 객체를 돌려주므로 운영 환경에 켜 둬도 부담이 없습니다.
+ENABLED = os.environ.get("COACH_TELEMETRY", "0") == "1"
+TRACE_PATH = os.environ.get("COACH_TELEMETRY_PATH", os.path.join(".cache", "telemetry.jsonl"))
+METRICS_PATH = os.environ.get("COACH_TELEMETRY_METRICS", os.path.join(".cache", "telemetry.prom"))
+
+_current = contextvars.ContextVar("coach_trace", default=None)
+_lock = threading.Lock()
+_stage_totals = {}  # 구간명 -> [횟수, 합계(초)]
+_llm_totals = {}  # 호출 종류 -> {calls, errors, latency, ttft, ttft_count, prompt_tokens, completion_tokens}
+
+
+def memory_mb():
+    # 현재 RSS (Linux는 /proc, 그 외 Unix는 최대 RSS로 대체, Windows는 0)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # Unix 전용 모듈
+    except ImportError:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    """
+    한 번의 실행(rerun/fragment 재실행/CLI 실행)에서 기록한 구간 목록입니다.
+    """
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.memory_start = memory_mb()
+        self.spans = []
+        self.duration = None
+        self.memory_end = None
+
+    def add(self, name, start, duration, attrs):
+        self.spans.append({"name": name, "start": start - self.started, "duration": duration, **attrs})
+
+    def to_dict(self):
+        return {
+            "trace": self.id, "name": self.name, "ts": self.started_at, "duration": self.duration,
+            "memory_mb": [round(self.memory_start, 1), round(self.memory_end or 0, 1)], "spans": self.spans,
+        }
+
+
+class _Span:
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.trace.add(self.name, self.start, time.perf_counter() - self.start, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    """
+    with span("scoring"): ... 형태로 구간을 잽니다. 계측이 꺼져 있거나 진행 중인 trace가 없으면 아무것도 하지 않습니다.
+    """
+    if not ENABLED:
+        return _NOOP
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, attrs)
+
+
+def start_trace(name):
+    # 이전 실행이 중단되어(st.rerun, 예외 등) 마무리되지 않은 trace는 기록하지 않고 버림
+    if not ENABLED:
+        return None
+    trace = Trace(name)
+    _current.set(trace)
+    return trace
+
+
+def finish_trace(trace):
+    """
+    trace를 마무리해 JSONL에 한 줄 추가하고, 누적 지표(Prometheus 텍스트 파일)를 갱신합니다.
+    """
+    if trace is None:
+        return None
+    trace.duration = time.perf_counter() - trace.started
+    trace.memory_end = memory_mb()
+    _current.set(None)
+    with _lock:
+        # LLM 호출(llm:*)은 _llm_totals에 따로 집계되므로 구간 합계에서는 제외
+        for s in [{"name": trace.name, "duration": trace.duration}, *trace.spans]:
+            if s["name"].startswith("llm:"):
+                continue
+            totals = _stage_totals.setdefault(s["name"], [0, 0.0])
+            totals[0] += 1
+            totals[1] += s["duration"]
+        _append(TRACE_PATH, json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+        _write_metrics(trace.memory_end)
+    return trace
+
+
+def traced(name):
+    """
+    함수 전체를 하나의 구간으로 잽니다. 이미 trace 안이면 span으로, 아니면(예: fragment 단독 재실행) 새 trace로 기록합니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            if _current.get() is not None:
+                with span(name):
+                    return func(*args, **kwargs)
+            trace = start_trace(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish_trace(trace)
+        return wrapper
+    return decorator
+
+
+def record_llm(metric):
+    """
+    LLM 게이트웨이의 호출 기록(지연시간/TTFT/토큰 수)을 현재 trace와 누적 지표에 반영합니다.
+    """
+    if not ENABLED:
+        return
+    trace = _current.get()
+    if trace is not None:
+        trace.add(f"llm:{metric['kind']}", time.perf_counter() - metric["latency"], metric["latency"], {
+            k: metric[k] for k in ("model", "ok", "attempts", "ttft", "prompt_tokens", "completion_tokens")
+        })
+    with _lock:
+        totals = _llm_totals.setdefault(metric["kind"], {
+            "calls": 0, "errors": 0, "latency": 0.0, "ttft": 0.0, "ttft_count": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        })
+        totals["calls"] += 1
+        totals["errors"] += 0 if metric["ok"] else 1
+        totals["latency"] += metric["latency"]
+        if metric["ttft"] is not None:
+            totals["ttft"] += metric["ttft"]
+            totals["ttft_count"] += 1
+        totals["prompt_tokens"] += metric["prompt_tokens"] or 0
+        totals["completion_tokens"] += metric["completion_tokens"] or 0
+
+
+def _append(path, line):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def _write_metrics(memory):
+    # Prometheus 텍스트 형식 (node_exporter textfile collector 등으로 수집), 임시 파일에 쓴 뒤 교체
+    lines = [
+        "# HELP coach_stage_seconds 구간별 소요 시간",
+        "# TYPE coach_stage_seconds summary",
+    ]
+    for name, (count, total) in sorted(_stage_totals.items()):
+        lines.append(f'coach_stage_seconds_count{{stage="{name}"}} {count}')
+        lines.append(f'coach_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+    # 지표 이름(family)마다 HELP/TYPE 아래에 호출 종류별 값을 모아서 출력 (Prometheus 텍스트 형식 규칙)
+    llm = sorted(_llm_totals.items())
+    families = [
+        ("coach_llm_calls_total", "counter", "LLM 호출 수", [("", {}, "calls")]),
+        ("coach_llm_errors_total", "counter", "실패한 LLM 호출 수", [("", {}, "errors")]),
+        ("coach_llm_latency_seconds", "summary", "LLM 호출 전체 소요 시간", [("_sum", {}, "latency"), ("_count", {}, "calls")]),
+        ("coach_llm_ttft_seconds", "summary", "LLM 첫 토큰까지 시간", [("_sum", {}, "ttft"), ("_count", {}, "ttft_count")]),
+        ("coach_llm_tokens_total", "counter", "LLM 토큰 수", [
+            ("", {"type": "prompt"}, "prompt_tokens"), ("", {"type": "completion"}, "completion_tokens"),
+        ]),
+    ]
+    for family, metric_type, help_text, samples in families:
+        lines += [f"# HELP {family} {help_text}", f"# TYPE {family} {metric_type}"]
+        for suffix, extra, field in samples:
+            for kind, t in llm:
+                labels = ",".join(f'{k}="{v}"' for k, v in {"kind": kind, **extra}.items())
+                value = t[field]
+                lines.append(f"{family}{suffix}{{{labels}}} {value:.6f}" if isinstance(value, float) else f"{family}{suffix}{{{labels}}} {value}")
+    lines += [
+        "# HELP coach_process_resident_memory_bytes 현재 RSS",
+        "# TYPE coach_process_resident_memory_bytes gauge",
+        f"coach_process_resident_memory_bytes {int(memory * 2**20)}",
+    ]
+    directory = os.path.dirname(METRICS_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{METRICS_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, METRICS_PATH)
+
+
+def stage_breakdown(trace):
+    # 디버그 패널용: 구간명별 합계(초)와 횟수
+    breakdown = {}
+    for s in trace.spans:
+        total = breakdown.setdefault(s["name"], [0.0, 0])
+        total[0] += s["duration"]
+        total[1] += 1
+    return breakdown